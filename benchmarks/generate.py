@@ -0,0 +1,89 @@
+import argparse
+
+
+# Synthetic `.fl` programs for the benchmarks. `flows` flows are laid out in chains `depth` long, each
+# flow calling the one before it in its chain, so the chain heads nest `depth` deep; every flow has
+# `statements` body statements (or blocks of them) of the given `kind`, and `builds` builds cycle
+# over the chain heads with different input sizes.
+
+
+
+def mlp(n : int) -> list[str]:
+    # a stack of dense layers, each with its own weights
+    body = []
+    for i in range(n):
+        body.append(f'h = (w{i // 2} @ h) + b{i // 2};' if i % 2 == 0 else f'h = h * {i};')
+    return body
+
+def residual(n : int, width : int = 4) -> list[str]:
+    # groups of `width` parallel branches summed back into the stream, each group with its own weights
+    body = []
+    for i in range(n):
+        body.append(f'r{i % width} = (w{i // width} @ h) + b{i // width};')
+        if i % width == width - 1: body.append('h = h + ' + ' + '.join(f'r{j}' for j in range(width)) + ';')
+    return body
+
+def transformer(n : int) -> list[str]:
+    # `n` blocks of single-head attention followed by a feed-forward layer
+    body = []
+    for _ in range(n):
+        body += [
+            'q = wq @ h;',
+            'k = wk @ h;',
+            'v = wv @ h;',
+            's = (q.T) @ k;',
+            'h = h + (v @ s);',
+            'f = (w @ h) + b;',
+            'h = h + (wo @ f);',
+        ]
+    return body
+
+def sums(n : int) -> list[str]:
+    # one dense layer, then a single sum `n` terms long
+    return ['h = (w @ h) + b;', 'h = ' + ' + '.join(['h'] * n) + ';']
+
+kinds = {'mlp' : mlp, 'residual' : residual, 'transformer' : transformer, 'sum' : sums}
+params = {
+    'mlp' : lambda n : [f'{x}{i}' for i in range((n + 1) // 2) for x in 'wb'],
+    'residual' : lambda n : [f'{x}{i}' for i in range((n + 3) // 4) for x in 'wb'],
+    'transformer' : lambda n : ['wq', 'wk', 'wv', 'w', 'b', 'wo'],
+    'sum' : lambda n : ['w', 'b'],
+}
+
+
+def generate(kind : str = 'mlp', flows : int = 10, depth : int = 5, statements : int = 8, builds : int = 1) -> str:
+    '''Source of a program of `flows` flows of `kind` in chains `depth` long, with `builds` builds.'''
+    lines, heads = [], []
+    for i in range(flows):
+        name = f'{kind}{i}'
+        lines.append(f'flow {name}(x) [{", ".join(params[kind](statements))}] {{')
+        if i % depth != 0: lines.append(f'    let {kind}{i - 1} g;')
+        lines.append('    h = x;')
+        lines += [f'    {each}' for each in kinds[kind](statements)]
+        if i % depth != 0: lines.append('    h = g(h);')
+        lines.append('    return h;')
+        lines.append('}')
+        lines.append('')
+        
+        if (i % depth == depth - 1) or (i == flows - 1): heads.append(name)
+    
+    for j in range(builds):
+        lines.append(f'build {heads[j % len(heads)]} b{j} {{')
+        lines.append(f'    x => ({16 + j}, {1 + (j % 4)});')
+        lines.append('}')
+        lines.append('')
+    
+    return '\n'.join(lines)
+
+
+
+if __name__ == '__main__':
+    cliparser = argparse.ArgumentParser(description = 'Writes a synthetic flow program to stdout.')
+    cliparser.add_argument('kind', choices = list(kinds))
+    cliparser.add_argument('--flows', type = int, default = 10)
+    cliparser.add_argument('--depth', type = int, default = 5)
+    cliparser.add_argument('--statements', type = int, default = 8)
+    cliparser.add_argument('--builds', type = int, default = 1)
+    args = cliparser.parse_args()
+    
+    print(generate(args.kind, args.flows, args.depth, args.statements, args.builds))
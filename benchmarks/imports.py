@@ -0,0 +1,67 @@
+import argparse, subprocess, tempfile, os, sys
+
+from startup import project, command
+
+
+# Guards the cold start of the `flow` entry point with `python -X importtime`. Each subcommand runs in
+# a fresh interpreter, must import none of the packages it has no use for, and must spend no longer
+# than its budget importing, across all modules. Exits 1 otherwise. Budgets are about three times what
+# the imports take on a development machine, so only a new heavyweight import trips them; `--scale`
+# adjusts them for slower machines.
+
+cases = {
+    # name : (arguments, packages it must not import, budget in ms)
+    'help'      : (['--help'], ['ply', 'frontend', 'dulwich', 'codex'], 100),
+    'install'   : (['-i', os.path.join(os.sep, 'nonexistent', 'plugin.git')], ['ply', 'frontend'], 400),
+    'sync'      : (['--sync'], ['ply', 'frontend'], 400),
+    'file'      : (['-f', 'tiny.fl', '-q'], ['dulwich'], 300),
+}
+
+
+def imports(args : list[str], directory : str) -> list[tuple[str, int]]:
+    '''Every module `flow` with `args` imports in `directory`, with the microseconds it took on its own.'''
+    # `-i` and `--sync` fail here, on a path and a plugin that are not repositories; the imports come first
+    result = subprocess.run(command(*args, options = ['-X', 'importtime']), cwd = directory, capture_output = True, text = True)
+    
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'): continue
+        took, _, name = line.removeprefix('import time:').split('|')
+        if took.strip().isdigit(): modules.append((name.strip(), int(took)))
+    return modules
+
+
+def check(name : str, scale : float) -> list[str]:
+    '''Runs the case `name`, printing its import time; returns what it got wrong.'''
+    args, forbidden, budget = cases[name]
+    with tempfile.TemporaryDirectory() as directory:
+        project(directory)
+        modules = imports(args, directory)
+    
+    total = sum(took for _, took in modules) / 1000
+    print(f'{name:<12}{len(modules):>10}{total:>12.1f}{budget * scale:>12.0f}', flush = True)
+    
+    wrong = [f'`flow {" ".join(args)}` imported `{x}`' for x, _ in modules if x.split('.')[0] in forbidden]
+    if not modules: wrong.append(f'`flow {" ".join(args)}` reported no imports')
+    if total > budget * scale: wrong.append(f'`flow {" ".join(args)}` spent {total:.0f} ms importing, over its {budget * scale:.0f} ms')
+    return wrong
+
+
+
+if __name__ == '__main__':
+    cliparser = argparse.ArgumentParser(description = 'Checks each `flow` subcommand imports only what it needs, within its budget.')
+    cliparser.add_argument('cases', nargs = '*', metavar = 'CASE', help = f'Cases to run (default: all of {", ".join(cases)}).')
+    cliparser.add_argument('-s', '--scale', type = float, default = 1.0, help = 'Factor for every budget (default: 1).')
+    args = cliparser.parse_args()
+    
+    selected = args.cases or list(cases)
+    for each in selected:
+        if each not in cases: cliparser.error(f'unknown case `{each}`')
+    
+    print(f'{"case":<12}{"modules":>10}{"ms":>12}{"budget":>12}')
+    wrong = []
+    for each in selected: wrong += check(each, args.scale)
+    
+    if wrong:
+        print('\n' + '\n'.join(wrong))
+        sys.exit(1)
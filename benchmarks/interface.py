@@ -0,0 +1,82 @@
+import argparse, os, sys
+
+# checks the working tree, not whatever `flow` is installed
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root, 'src'))
+
+from generate import generate
+from startup import tiny
+
+
+# Plugins get the shaped context of a build, and tell a flow's inputs, parameters and locals apart by
+# the type of their keys in `context.shapes`: `Symbol`, `Arg` and `Var`, with build specs and outputs
+# keyed by `str`. Compiles the README example and a few synthetic programs, shared subflows and all,
+# and checks every context keeps those types; `tiny` must match the original compiler key for key.
+# Exits 1 otherwise.
+
+programs = {
+    'tiny' : lambda : tiny,
+    'mlp' : lambda : generate('mlp', 12, 4, 4, 3),
+    'residual' : lambda : generate('residual', 8, 4, 8, 2),
+    'transformer' : lambda : generate('transformer', 6, 3, 2, 2),
+}
+
+# as the compiler has always keyed them, in order
+expected = {
+    'tiny' : [
+        ('x', 'Symbol'), ('output', 'str'), ('l1', 'str'), ('l1/x', 'Symbol'), ('l1/output', 'str'),
+        ('l1/weights', 'Arg'), ('l1/biases', 'Arg'), ('y', 'Var'), ('l2', 'Var'), ('l2/x', 'Symbol'),
+        ('l2/weights', 'Arg'), ('l2/biases', 'Arg'), ('l2/output', 'str'),
+    ],
+}
+
+
+def keys(context) -> list[tuple[str, str, list[str]]]:
+    '''Path, key type and what is wrong with it, of every entry of the context tree under `context`.'''
+    from frontend.middle import Context
+    from utils.nodes import Symbol, Arg, Var
+    
+    found, paths = [], {id(context) : ''}
+    for owner, key, value in context.walk():
+        path = paths[id(owner)] + str(key)
+        if type(value) == Context: paths[id(value)] = path + '/'
+        
+        wrong = []
+        proto = owner.flow.proto if owner.flow is not None else None
+        if proto is not None:
+            if str(key) in [x.name for x in proto.symbols or []]: wanted = Symbol
+            elif str(key) in [x.name for x in proto.args or []]: wanted = Arg
+            else: wanted = None
+            if (wanted is not None) and (type(key) != wanted): wrong.append(f'should be `{wanted.__name__}`')
+        if type(key) not in [Symbol, Arg, Var, str]: wrong.append('is not a `Var` or `str`')
+        
+        found.append((path, type(key).__name__, wrong))
+    return found
+
+
+
+if __name__ == '__main__':
+    cliparser = argparse.ArgumentParser(description = 'Checks the keys plugins get in a shaped context keep their types.')
+    cliparser.add_argument('programs', nargs = '*', metavar = 'PROGRAM', help = f'Programs to check (default: all of {", ".join(programs)}).')
+    args = cliparser.parse_args()
+    
+    selected = args.programs or list(programs)
+    for each in selected:
+        if each not in programs: cliparser.error(f'unknown program `{each}`')
+    
+    from frontend.compiler import compile_source
+    from utils.logging import reporter
+    
+    reporter.quiet = True
+    failed = []
+    for each in selected:
+        _, context = compile_source(programs[each]())
+        found = keys(context)
+        failed += [f'{each}: `{path}` is a `{kind}`, and {" and ".join(wrong)}' for path, kind, wrong in found if wrong]
+        if (each in expected) and ([x[:2] for x in found] != expected[each]):
+            failed.append(f'{each}: keyed {[x[:2] for x in found]}, not {expected[each]}')
+        print(f'{each:<16}{len(found):>8} keys', flush = True)
+    
+    if failed:
+        print('\n' + '\n'.join(failed))
+        sys.exit(1)
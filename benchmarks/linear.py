@@ -0,0 +1,56 @@
+import argparse, sys
+
+from generate import generate
+from run import once
+
+
+# Compiles long expressions and deeply nested subflows at growing sizes, all past the interpreter's
+# recursion limit, which is left as it is. Every compile must finish, and the time per term or per
+# level of nesting must stay flat as they grow: the passes keep their own stacks, and one that
+# recursed, or went back over what it had already walked, would fail here. Exits 1 otherwise.
+
+cases = {
+    # name : (program of size n, sizes)
+    'sum' : (lambda n : generate('sum', 1, 1, n, 1), [12500, 25000, 50000]),
+    'nested' : (lambda n : generate('mlp', n, n, 2, 1), [500, 1000, 2000]),
+}
+
+
+def scaling(name : str, repeat : int) -> tuple[list[float], str | None]:
+    '''Best compile time per element at each size of the case `name`, and the error that stopped it, if any.'''
+    program, sizes = cases[name]
+    per = []
+    for size in sizes:
+        source = program(size)
+        try: best = min(sum(once(source).values()) for _ in range(repeat))
+        except RecursionError: return per, f'`{name}` of {size} ran into the recursion limit'
+        
+        per.append(best / size)
+        print(f'{name:<10}{size:>10}{best * 1000:>12.1f}{per[-1] * 1e6:>14.2f}', flush = True)
+    
+    return per, None
+
+
+
+if __name__ == '__main__':
+    cliparser = argparse.ArgumentParser(description = 'Checks long expressions and deep nesting compile in linear time.')
+    cliparser.add_argument('cases', nargs = '*', metavar = 'CASE', help = f'Cases to run (default: all of {", ".join(cases)}).')
+    cliparser.add_argument('-r', '--repeat', type = int, default = 3, help = 'Runs per size; the best counts (default: 3).')
+    cliparser.add_argument('-t', '--tolerance', type = float, default = 2.0, help = 'Largest ratio of time per element, largest size to smallest (default: 2; quadratic time would be 4).')
+    args = cliparser.parse_args()
+    
+    selected = args.cases or list(cases)
+    for each in selected:
+        if each not in cases: cliparser.error(f'unknown case `{each}`')
+    
+    print(f'{"case":<10}{"size":>10}{"best, ms":>12}{"us/element":>14}')
+    wrong = []
+    for each in selected:
+        per, error = scaling(each, args.repeat)
+        if error is not None: wrong.append(error)
+        elif per[-1] / per[0] > args.tolerance:
+            wrong.append(f'`{each}` took {per[-1] / per[0]:.2f} times as long per element at its largest size as at its smallest')
+    
+    if wrong:
+        print('\n' + '\n'.join(wrong))
+        sys.exit(1)
@@ -0,0 +1,134 @@
+import argparse, datetime, platform, tracemalloc, json, gc, os, sys
+
+# measures the working tree, not whatever `flow` is installed
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root, 'src'))
+
+from generate import generate
+from run import revision
+
+
+# Parses and irons one synthetic program under `tracemalloc`, and reports the heap the AST holds and
+# its bytes per node, lists and strings included; then the bytes of each kind of node on its own,
+# allocated `--count` at a time. Results are saved under `benchmarks/results/`; `--compare` reports
+# them against a previous result, and exits 1 if memory per node grew. It only needs the lexer, parser
+# and `iron`, so `benchmarks/` can be copied onto an older revision to save a result to compare with.
+
+
+def nodes(program) -> int:
+    '''Number of AST nodes and statements reachable from `program`, each counted once.'''
+    from utils.nodes import Node, Statement, Body
+    
+    seen, pending, count = set(), [program.flows, program.builds], 0
+    while pending:
+        node = pending.pop()
+        if id(node) in seen: continue
+        if type(node) in [list, tuple]:
+            pending.extend(node)
+            continue
+        if not isinstance(node, (Node, Statement, Body)): continue
+        
+        seen.add(id(node))
+        count += not isinstance(node, Body)
+        pending.extend(getattr(node, x, None) for x in getattr(node, '__dataclass_fields__', ()))
+    
+    return count
+
+
+def ast(source : str) -> tuple[int, int]:
+    '''Bytes allocated by parsing and ironing `source`, and the nodes they hold.'''
+    from frontend.lexy import lexer
+    from frontend.percy import parser
+    from frontend.middle import iron
+    from utils.nodes import Program, FlowDef, Build
+    
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    lexer.lineno = 1
+    parsed = parser.parse(source, lexer = lexer)
+    program = iron(Program(
+        name = None, flows = [x for x in parsed if type(x) == FlowDef], builds = [x for x in parsed if type(x) == Build]
+    ))
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return after - before, nodes(program)
+
+
+def each(make, count : int) -> float:
+    '''Bytes per object of `count` objects made by `make`.'''
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    made = [make() for _ in range(count)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    del made
+    return (after - before) / count
+
+
+def compare(old : dict, new : dict, threshold : float) -> list[str]:
+    '''Prints bytes per node of `new` against `old`; returns the figures over `threshold` larger.'''
+    grown = []
+    print(f'\n{"vs " + str(old.get("revision")):<30}{"before":>10}{"after":>10}{"ratio":>10}')
+    for name in new['bytes']:
+        if name not in old['bytes']: continue
+        a, b = old['bytes'][name], new['bytes'][name]
+        ratio = b / a if a > 0 else 1.0
+        if ratio > 1 + threshold: grown.append(name)
+        print(f'{name:<30}{a:>10.0f}{b:>10.0f}{ratio:>9.2f}' + ('!' if ratio > 1 + threshold else ' '))
+    return grown
+
+
+
+if __name__ == '__main__':
+    cliparser = argparse.ArgumentParser(description = 'Reports the memory the AST of a synthetic flow program takes per node.')
+    cliparser.add_argument('-n', '--count', type = int, default = 100000, help = 'Objects of each kind of node to allocate (default: 100000).')
+    cliparser.add_argument('-o', '--output', metavar = 'FILE', help = 'Where to save the results (default: benchmarks/results/memory-<revision>.json).')
+    cliparser.add_argument('-c', '--compare', metavar = 'FILE', help = 'Previous results to compare against; exits 1 if any figure grew.')
+    cliparser.add_argument('-t', '--threshold', type = float, default = 0.05, help = 'Growth tolerated by --compare (default: 0.05, 5%%).')
+    cliparser.add_argument('--kind', default = 'mlp', help = 'Program to parse, as for `generate.py` (default: mlp).')
+    cliparser.add_argument('--flows', type = int, default = 20)
+    cliparser.add_argument('--depth', type = int, default = 4)
+    cliparser.add_argument('--statements', type = int, default = 500)
+    args = cliparser.parse_args()
+    
+    from frontend.middle import Context
+    from utils.nodes import Shape, Op, Var, Term
+    
+    results = {
+        'revision' : revision(), 'date' : datetime.datetime.now().isoformat(timespec = 'seconds'),
+        'python' : platform.python_version(), 'machine' : platform.platform(),
+        'params' : {x : getattr(args, x) for x in ['kind', 'flows', 'depth', 'statements', 'count']},
+        'bytes' : dict(),
+    }
+    
+    size, count = ast(generate(args.kind, args.flows, args.depth, args.statements, 1))
+    results.update({'nodes' : count, 'heap' : size})
+    results['bytes']['AST, per node'] = size / count
+    print(f'{args.flows * args.statements} statements, {count} nodes: {size / (1 << 20):.1f} MiB after iron, {size / count:.0f} B/node')
+    
+    # unknowns are only ever made by a context, which may keep more of its own for each
+    context = Context()
+    for name, make in [
+        ('Dimension', context.define_dimension), ('ShapeLength', context.define_shape_length), ('Shape', lambda: Shape(dims = None, length = 2)),
+        ('Op', lambda: Op(value = '+', left = None, right = None, line = 1, charpos = 2)),
+        ('Var', lambda: Var(name = 'x', line = 1, charpos = 2)), ('Term', lambda: Term(value = 'x', line = 1, charpos = 2)),
+    ]:
+        results['bytes'][name] = each(make, args.count)
+        print(f'{name:<16}{results["bytes"][name]:>8.0f} B')
+    
+    output = args.output or os.path.join(root, 'benchmarks', 'results', f'memory-{results["revision"] or "results"}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok = True)
+    with open(output, 'w') as file: json.dump(results, file, indent = '\t')
+    print(f'\nResults saved to `{output}`.')
+    
+    if args.compare:
+        with open(args.compare, 'r') as file: old = json.load(file)
+        grown = compare(old, results, args.threshold)
+        if grown:
+            print(f'\nLarger than `{args.compare}` by over {args.threshold:.0%}: {", ".join(grown)}')
+            sys.exit(1)
@@ -0,0 +1,158 @@
+import argparse, platform, subprocess, statistics, datetime, pickle, time, json, gc, os, sys
+
+# benchmarks the working tree, not whatever `flow` is installed
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root, 'src'))
+
+from generate import generate
+
+
+# Times each stage of the compiler on synthetic programs, best and median of `--repeat` runs, and saves
+# the results under `benchmarks/results/`; `--compare` reports the stages that got slower than a
+# previous result. `parse` includes the lexing that `lex` times on its own, and its throughput is
+# reported in tokens per second. Every run compiles from a fresh parse, since checking and inference
+# mutate the AST.
+
+cases = {
+    'mlp-deep'        : dict(kind = 'mlp', flows = 200, depth = 50, statements = 8, builds = 2),
+    'mlp-long'        : dict(kind = 'mlp', flows = 8, depth = 8, statements = 400, builds = 1),
+    'residual-wide'   : dict(kind = 'residual', flows = 300, depth = 6, statements = 16, builds = 4),
+    'transformer'     : dict(kind = 'transformer', flows = 48, depth = 12, statements = 4, builds = 3),
+    'many-builds'     : dict(kind = 'mlp', flows = 40, depth = 4, statements = 6, builds = 64),
+    # past the interpreter's recursion limit; `linear.py` checks both scale linearly
+    'sum-50k'         : dict(kind = 'sum', flows = 1, depth = 1, statements = 50000, builds = 1),
+    'nested-2k'       : dict(kind = 'mlp', flows = 2000, depth = 2000, statements = 2, builds = 1),
+}
+stages = ['lex', 'parse', 'iron', 'check_flows', 'check_builds', 'shapes']
+
+
+def lex(source : str) -> int:
+    from frontend.lexy import lexer
+    
+    lexer.input(source)
+    lexer.lineno = 1
+    count = 0
+    while lexer.token() is not None: count += 1
+    return count
+
+def once(source : str) -> dict[str, float]:
+    from frontend.lexy import lexer
+    from frontend.percy import parser
+    from frontend.compiler import check_flows, check_builds, shape_build
+    from frontend.middle import iron
+    from utils.nodes import Program, FlowDef, Build
+    
+    times = dict()
+    def timed(stage : str, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        times[stage] = times.get(stage, 0.0) + time.perf_counter() - start
+        return result
+    
+    timed('lex', lex, source)
+    
+    lexer.lineno = 1
+    ast = timed('parse', lambda: parser.parse(source, lexer = lexer))
+    program = Program(
+        name = None, flows = [x for x in ast if type(x) == FlowDef], builds = [x for x in ast if type(x) == Build],
+        file = source
+    )
+    timed('iron', iron, program)
+    timed('check_flows', check_flows, program)
+    timed('check_builds', check_builds, program)
+    
+    # each build is shaped on its own copy of the checked program, as with `flow --all-builds`; a
+    # single build needs none, which spares pickling programs too deep for it
+    times['shapes'] = 0.0
+    if len(program.builds) == 1:
+        timed('shapes', shape_build, program, program.builds[0])
+        return times
+    
+    checked = pickle.dumps(program)
+    for i in range(len(program.builds)):
+        copy = pickle.loads(checked)
+        copy.checked = None
+        timed('shapes', shape_build, copy, copy.builds[i])
+    
+    return times
+
+
+def measure(case : dict, repeat : int) -> dict:
+    source = generate(**case)
+    runs = []
+    for _ in range(repeat):
+        gc.collect()
+        runs.append(once(source))
+    
+    return {
+        'params' : case, 'lines' : source.count('\n'), 'tokens' : lex(source),
+        'best' : {x : min(run[x] for run in runs) for x in stages},
+        'median' : {x : statistics.median(run[x] for run in runs) for x in stages},
+    }
+
+
+def revision() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], cwd = root, capture_output = True, text = True, check = True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError): return None
+
+
+def compare(old : dict, new : dict, threshold : float) -> list[str]:
+    '''Prints best times of `new` against `old`; returns the `case/stage`s over `threshold` (and a millisecond) slower.'''
+    slower = []
+    print(f'\n{"vs " + str(old.get("revision")):<30}' + ''.join(f'{x:>14}' for x in stages))
+    for case in new['cases']:
+        if case not in old['cases']: continue
+        cells = []
+        for stage in stages:
+            a, b = old['cases'][case]['best'][stage], new['cases'][case]['best'][stage]
+            ratio = b / a if a > 0 else 1.0
+            # stages that take well under a millisecond are all noise
+            slow = (ratio > 1 + threshold) and (b - a > 0.001)
+            if slow: slower.append(f'{case}/{stage}')
+            cells.append(f'{ratio:>13.2f}' + ('!' if slow else ' '))
+        print(f'{case:<30}' + ''.join(cells))
+    return slower
+
+
+
+if __name__ == '__main__':
+    cliparser = argparse.ArgumentParser(description = 'Times the compiler stages on synthetic flow programs.')
+    cliparser.add_argument('cases', nargs = '*', metavar = 'CASE', help = f'Cases to run (default: all of {", ".join(cases)}).')
+    cliparser.add_argument('-r', '--repeat', type = int, default = 5, help = 'Runs per case (default: 5).')
+    cliparser.add_argument('-o', '--output', metavar = 'FILE', help = 'Where to save the results (default: benchmarks/results/<revision>.json).')
+    cliparser.add_argument('-c', '--compare', metavar = 'FILE', help = 'Previous results to compare against; exits 1 if any stage got slower.')
+    cliparser.add_argument('-t', '--threshold', type = float, default = 0.1, help = 'Slowdown tolerated by --compare (default: 0.1, 10%%).')
+    args = cliparser.parse_args()
+    
+    selected = args.cases or list(cases)
+    for each in selected:
+        if each not in cases: cliparser.error(f'unknown case `{each}`')
+    
+    results = {
+        'revision' : revision(), 'date' : datetime.datetime.now().isoformat(timespec = 'seconds'),
+        'python' : platform.python_version(), 'machine' : platform.platform(), 'repeat' : args.repeat,
+        'cases' : dict(),
+    }
+    
+    print(f'{"best of " + str(args.repeat) + ", ms":<30}' + ''.join(f'{x:>14}' for x in stages) + f'{"parse tok/s":>14}')
+    for each in selected:
+        case = results['cases'][each] = measure(cases[each], args.repeat)
+        print(
+            f'{each:<30}' + ''.join(f'{case["best"][x] * 1000:>14.2f}' for x in stages) +
+            f'{case["tokens"] / max(case["best"]["parse"], 1e-9):>14,.0f}'
+        )
+    
+    output = args.output or os.path.join(root, 'benchmarks', 'results', f'{results["revision"] or "results"}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok = True)
+    with open(output, 'w') as file: json.dump(results, file, indent = '\t')
+    print(f'\nResults saved to `{output}`.')
+    
+    if args.compare:
+        with open(args.compare, 'r') as file: old = json.load(file)
+        slower = compare(old, results, args.threshold)
+        if slower:
+            print(f'\nSlower than `{args.compare}` by over {args.threshold:.0%}: {", ".join(slower)}')
+            sys.exit(1)
@@ -0,0 +1,72 @@
+import argparse, tempfile, types, json, gc, os, sys
+
+# soaks the working tree, not whatever `flow` is installed
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root, 'src'))
+
+from generate import generate
+
+
+# Compiles one synthetic program over and over through `frontend.main.process_file`, as a long-running
+# service would, dropping each result before the next. The resident set size must stay flat once warmed
+# up, and every compile must come out exactly like the first: ids included, since a cache keyed on the
+# output is only as good as its determinism. Exits 1 otherwise.
+
+
+def rss() -> int:
+    # current resident set size where /proc has it, the peak otherwise; both only grow if something leaks
+    try:
+        with open('/proc/self/statm', 'r') as file: return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+def soak(path : str, runs : int, every : int) -> tuple[list[tuple[int, int]], int]:
+    '''RSS after every `every` of `runs` compiles of the file at `path`, and how many compiles differed from the first.'''
+    from frontend.main import process_file
+    from utils.logging import reporter
+    
+    reporter.quiet = True
+    args = types.SimpleNamespace(filename = path, build = None, quiet = True, cache = None)
+    
+    first, differ, samples = None, 0, []
+    for i in range(1, runs + 1):
+        ast, context = process_file(args)
+        output = json.dumps(context.getdict())
+        del ast, context
+        
+        if first is None: first = output
+        elif output != first: differ += 1
+        
+        if i % every == 0:
+            gc.collect()
+            samples.append((i, rss()))
+            print(f'{i:>8}{samples[-1][1] / (1 << 20):>12.1f} MiB', flush = True)
+    
+    return samples, differ
+
+
+
+if __name__ == '__main__':
+    cliparser = argparse.ArgumentParser(description = 'Compiles a synthetic flow program many times over, checking memory stays flat.')
+    cliparser.add_argument('-n', '--runs', type = int, default = 10000, help = 'Compiles (default: 10000).')
+    cliparser.add_argument('-e', '--every', type = int, default = 1000, help = 'Compiles between RSS samples (default: 1000).')
+    cliparser.add_argument('-t', '--tolerance', type = float, default = 1.0, help = 'MiB of growth tolerated after the first sample (default: 1).')
+    cliparser.add_argument('--kind', default = 'mlp', help = 'Program to compile, as for `generate.py` (default: mlp).')
+    cliparser.add_argument('--flows', type = int, default = 12)
+    cliparser.add_argument('--depth', type = int, default = 4)
+    cliparser.add_argument('--statements', type = int, default = 8)
+    args = cliparser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'soak.fl')
+        with open(path, 'w') as file: file.write(generate(args.kind, args.flows, args.depth, args.statements, 1))
+        
+        print(f'{"compiles":>8}{"rss":>16}')
+        samples, differ = soak(path, args.runs, args.every)
+    
+    # the first sample is the baseline: by then every cache and lazy import has filled
+    growth = (samples[-1][1] - samples[0][1]) / (1 << 20) if samples else 0.0
+    print(f'\nRSS grew {growth:.1f} MiB after the first {samples[0][0] if samples else 0} compiles; {differ} differed from the first.')
+    if (growth > args.tolerance) or differ: sys.exit(1)
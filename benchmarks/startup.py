@@ -0,0 +1,82 @@
+import argparse, subprocess, statistics, tempfile, json, time, os, sys
+
+# times the working tree, not whatever `flow` is installed
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Times `flow -f tiny.fl` end to end, each run a fresh interpreter as from the shell, against the bare
+# interpreter starting up. Most of what is left is imports and loading the parser tables; they are
+# shipped pre-generated (`frontend/tables.py`), so nothing is built or written at startup.
+
+tiny = '''
+flow linear(x) [weights, biases] {
+    return
+        (weights @ x) + biases;
+}
+
+flow NeuralNetwork (x) {
+    let linear l1;
+    let linear l2;
+    
+    y = l1(x);
+    y = l2(y);
+    
+    return y;
+}
+
+build NeuralNetwork simple {
+    x => 784;
+    output => 10;
+    l1 => {
+        output => 16;
+    };
+}
+'''
+
+
+def project(directory : str) -> str:
+    '''Lays out `tiny.fl` in `directory` with a plugin that writes nothing, so `-f` runs no real backend; returns its path.'''
+    with open(os.path.join(directory, 'tiny.fl'), 'w') as file: file.write(tiny)
+    with open(os.path.join(directory, 'plugins.flow.json'), 'w') as file:
+        json.dump({'plugins' : {'null' : ''}, 'use-plugin' : 'null'}, file)
+    
+    os.makedirs(os.path.join(directory, 'flow_plugins', 'null'), exist_ok = True)
+    with open(os.path.join(directory, 'flow_plugins', 'null', 'plugin.py'), 'w') as file:
+        file.write('def main(ast, context):\n    return "", ast, context\n')
+    
+    return os.path.join(directory, 'tiny.fl')
+
+
+def command(*args : str, options : list[str] = []) -> list[str]:
+    '''An interpreter running `flow` from the working tree with `args`, and `options` for the interpreter.'''
+    code = f'import sys; sys.path.insert(0, {os.path.join(root, "src")!r}); sys.argv = ["flow", *{list(args)!r}]; from cli.main import main; main()'
+    return [sys.executable, *options, '-c', code]
+
+
+def timings(line : list[str], runs : int, directory : str) -> list[float]:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(line, cwd = directory, capture_output = True, check = True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+
+if __name__ == '__main__':
+    cliparser = argparse.ArgumentParser(description = 'Times `flow -f tiny.fl` from a cold interpreter.')
+    cliparser.add_argument('-r', '--repeat', type = int, default = 20, help = 'Runs of each (default: 20).')
+    args = cliparser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        project(directory)
+        
+        print(f'{str(args.repeat) + " runs, ms":<30}{"best":>10}{"median":>10}')
+        for name, line in [
+            ('python -c pass', [sys.executable, '-c', 'pass']),
+            ('flow --help', command('--help')),
+            ('flow -f tiny.fl', command('-f', 'tiny.fl', '-q')),
+        ]:
+            times = timings(line, args.repeat, directory)
+            print(f'{name:<30}{min(times) * 1000:>10.1f}{statistics.median(times) * 1000:>10.1f}')
+
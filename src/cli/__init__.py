@@ -1,10 +1,12 @@
-import argparse
+import argparse, os
+from typing import TYPE_CHECKING
 
-from utils.nodes import *
-from utils.logging import *
-from frontend.middle import followdim, Context
-
-from codex import dblog, ok, warning, error
+# `cli` is imported by every `flow` invocation, so it stays free of the compiler,
+# the plugin machinery and colour output; those are imported where they are used.
+if TYPE_CHECKING:
+    from utils.nodes import InferenceChain, CodeError
+    from utils.logging import Lines
+    from frontend.middle import Context
 
 
 def make_cli_parser() -> argparse.ArgumentParser:
@@ -14,18 +16,29 @@ def make_cli_parser() -> argparse.ArgumentParser:
         epilog=''
     )
     # cliparser.add_argument('command', help='', choices=['install'])
-    cliparser.add_argument('-f', '--filename', help='File name or path for the input code.')
+    cliparser.add_argument('-f', '--filename', nargs='+', help='File name or path for the input code; several files, globs or directories compile them all in parallel.')
     cliparser.add_argument('-b', '--build', metavar='B', help='Name of the build to process from the file. Defaults to the last defined build in the file.')
     cliparser.add_argument('-o', '--output', metavar='O', help='Name / path of the output file.')
     cliparser.add_argument('-i', '--install', metavar='I', help='Install a plugin from GitHub.')
     cliparser.add_argument('-s', '--sync', action='store_true', help='Install all plugins from json.')
+    cliparser.add_argument('--mirror', metavar='DIR', default=os.environ.get('FLOW_PLUGIN_MIRROR'), help='Keep a local mirror of plugin repositories in DIR, and install plugins from it (default: $FLOW_PLUGIN_MIRROR).')
     cliparser.add_argument('-d', '--debug', action='store_true', help='Print debug information.')
+    cliparser.add_argument('-q', '--quiet', action='store_true', help='Only print errors; no progress or status messages.')
+    cliparser.add_argument('-j', '--jobs', metavar='N', type=int, help='Number of worker processes for batch builds (default: the number of CPUs), or of concurrent downloads for --sync (default: 8).')
+    cliparser.add_argument('-a', '--all-builds', action='store_true', help='Process every build in the file in parallel, writing one output per build.')
+    cliparser.add_argument('--cache', metavar='DIR', nargs='?', const='.flowcache', help='Reuse parse, check and shape results of unchanged flows from DIR (default: .flowcache).')
+    cliparser.add_argument('--profile', metavar='PREFIX', nargs='?', const='flow.profile', help='Time every compiler phase and flow, with work counts and the process peak RSS after each phase, writing PREFIX.json (default: flow.profile).')
+    cliparser.add_argument('--profile-detail', action='store_true', help='With --profile, also trace the peak Python allocations of each phase on its own, and write a cProfile dump PREFIX.pstats. Several times slower.')
+    cliparser.add_argument('--serve', metavar='SOCK', nargs='?', const='.flow.sock', help='Run a compile daemon listening on the Unix socket SOCK (default: .flow.sock).')
+    cliparser.add_argument('--connect', metavar='SOCK', nargs='?', const='.flow.sock', help='Compile the input file on a running daemon instead of in-process.')
     return cliparser
 
 
 
 
-def show_chain(file : str, ic : InferenceChain, context : Context, cols : int = 50):
+def show_chain(file : 'str | Lines', ic : 'InferenceChain', context : 'Context', cols : int = 50):
+    from utils.logging import excerpt
+    
     chain = list(filter(lambda x:x[0] is not None, ic.chain))
     
     for i, (line, shape) in enumerate(chain[::-1]):
@@ -38,13 +51,16 @@ def show_chain(file : str, ic : InferenceChain, context : Context, cols : int =
 
 
 
-def show_error(msg : str, e : CodeError, file : str):
+def show_error(msg : str, e : 'CodeError', file : 'str | Lines'):
+    from utils.logging import excerpt
+    from codex import error
+    
     error(msg)
     if e.line is not None: print(excerpt(file, e.line))
     print(e)
     if e.ichain is not None:
         print('Inference chain:')
-        print(e.ichain)
+        show_chain(file, e.ichain, None)
 
 
 
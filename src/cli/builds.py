@@ -0,0 +1,168 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from types import SimpleNamespace
+
+import pickle, glob, os, sys
+
+
+# Builds run in worker processes. The parser tables and the plugin are loaded in the parent before
+# the pool starts, so forked workers share them; `setup` loads them in workers that were spawned.
+# Under `--all-builds` every build is shaped from its own copy of the checked program: building a
+# context and running the plugin both mutate the AST.
+program : bytes = None
+plugin = None
+
+
+def preload() -> None:
+    global plugin
+    from cli.main import load_plugin
+    import frontend.main
+    
+    if plugin is None: plugin = load_plugin()
+
+def setup(data : bytes = None) -> None:
+    global program
+    program = data
+    preload()
+
+
+def workers(cliargs, jobs : int) -> int:
+    return max(1, min(jobs, cliargs.jobs or os.cpu_count() or 1))
+
+
+def expand(patterns : list[str]) -> list[str]:
+    '''Input files named by `patterns`: directories stand for every `.fl` file under them, globs for their matches.'''
+    files = []
+    for each in patterns:
+        if os.path.isdir(each): files += sorted(glob.glob(os.path.join(each, '**', '*.fl'), recursive = True))
+        elif any(x in each for x in '*?['): files += sorted(glob.glob(each, recursive = True))
+        else: files.append(each)
+    return list(dict.fromkeys(files))
+
+
+def outname(cliargs, build : str) -> str:
+    # `-o model.py` becomes `model_<build>.py`, the default `<file>_<build>_flow.py`
+    if cliargs.output is not None:
+        stem, ext = os.path.splitext(cliargs.output)
+        return f'{stem}_{build}{ext}'
+    
+    _, filename = os.path.split(cliargs.filename)
+    return f'{filename.split(".")[0]}_{build}_flow.py'
+
+
+def outpath(cliargs, file : str) -> str:
+    # next to the source, or under `-o DIR` at the source's path relative to the working directory
+    stem = os.path.split(file)[1].split('.')[0]
+    if cliargs.output is None: return os.path.join(os.path.dirname(file), f'{stem}_flow.py')
+    
+    relative = os.path.dirname(os.path.relpath(file))
+    if relative.startswith('..') or os.path.isabs(relative): relative = ''
+    os.makedirs(os.path.join(cliargs.output, relative), exist_ok = True)
+    return os.path.join(cliargs.output, relative, f'{stem}_flow.py')
+
+
+def run(build : str, cliargs) -> tuple[int, str]:
+    from frontend.main import build_context, load_program, source, traced
+    from cli.main import write_output, show_chains, captured
+    
+    def job() -> None:
+        ast = pickle.loads(program) if program is not None else load_program(cliargs.filename, None)
+        # memoised checks are keyed by the ids of the flows they ran on
+        ast.checked = None
+        context = build_context(ast, build)
+        
+        if cliargs.debug: show_chains(source(ast.file, ast.path), traced(ast, build, context))
+        
+        write_output(cliargs, ast, context, plugin)
+    
+    return captured(job)
+
+
+def compile_file(cliargs) -> tuple[int, str]:
+    from frontend.main import process_file, source, traced
+    from cli.main import write_output, show_chains, captured
+    
+    def job() -> None:
+        ast, context = process_file(cliargs)
+        
+        if cliargs.debug: show_chains(source(ast.file, ast.path), traced(ast, cliargs.build, context))
+        
+        write_output(cliargs, ast, context, plugin)
+    
+    return captured(job)
+
+
+def build_all(cliargs) -> int:
+    '''Parses and checks the file once, then builds every build block in a process pool; returns the exit status.'''
+    from frontend.main import load_program
+    from frontend.cache import FlowCache
+    from codex import error
+    
+    cache = FlowCache(cliargs.cache) if cliargs.cache else None
+    ast = load_program(cliargs.filename, cache)
+    
+    # a build shadows earlier ones of the same name, as with `-b`
+    builds = list(dict.fromkeys(each.name for each in ast.builds))
+    status = 0
+    
+    # pickle recurses once per level of the AST; workers parse a program too deep for it themselves
+    try: data = pickle.dumps(ast)
+    except RecursionError: data = None
+    
+    preload()
+    with ProcessPoolExecutor(
+            max_workers = workers(cliargs, len(builds)), initializer = setup, initargs = (data,)
+        ) as pool:
+        jobs = {
+            pool.submit(run, build, SimpleNamespace(
+                filename = cliargs.filename, output = outname(cliargs, build), debug = cliargs.debug
+            )) : build
+            for build in builds
+        }
+        
+        for job in as_completed(jobs):
+            code, log = job.result()
+            sys.stdout.write(log)
+            if code != 0:
+                error(f'Build `{jobs[job]}` failed!')
+                status = code
+    
+    return status
+
+
+def build_files(files : list[str], cliargs) -> int:
+    '''Compiles every file in `files` in a process pool, reporting each failure and a summary; returns the exit status.'''
+    from utils.logging import reporter
+    from codex import ok, error, warning
+    
+    if not files:
+        error('No input files found! Exiting...')
+        return -1
+    
+    reporter.step(warning, f'Compiling {len(files)} files...')
+    failed = []
+    
+    preload()
+    with ProcessPoolExecutor(max_workers = workers(cliargs, len(files)), initializer = setup) as pool:
+        jobs = {
+            pool.submit(compile_file, SimpleNamespace(
+                filename = file, build = cliargs.build, output = outpath(cliargs, file),
+                debug = cliargs.debug, cache = cliargs.cache
+            )) : file
+            for file in files
+        }
+        
+        for job in as_completed(jobs):
+            code, log = job.result()
+            if cliargs.debug or (code != 0): sys.stdout.write(log)
+            if code == 0: continue
+            
+            failed.append(jobs[job])
+            error(f'Failed to compile `{jobs[job]}`!')
+    
+    if failed:
+        error(f'{len(files) - len(failed)} of {len(files)} files compiled, {len(failed)} failed:')
+        for each in sorted(failed): print(f'    {each}')
+        return -1
+    
+    ok(f'All {len(files)} files compiled!')
+    return 0
@@ -1,15 +1,15 @@
 from cli import *
-from frontend.main import process_file
-from frontend.middle import extract_shapes
 
-from codex import dblog, warning, error, ok
-from dulwich import porcelain
 from urllib.parse import urlparse
+from typing import Callable, Any
 
 import importlib
 
 
-import os, sys, json, pickle
+import os, sys, json, io, contextlib
+
+# Each subcommand imports only what it needs: `-i`/`-s` never load the compiler (and ply),
+# `-f` never loads dulwich, and `--help` loads neither.
 
 
 cwd = os.getcwd()
@@ -26,21 +26,77 @@ def get_repo_name_from_url(url : str):
     return repo_name
 
 
-def install_plugin(link : str):
+def install_plugin(link : str, mirror : str = None):
+    from cli.sync import install
+    from codex import ok
+    
     pluginname = get_repo_name_from_url(link)
-    if not os.path.exists(installspath): os.mkdir(installspath)
-    porcelain.clone(link, os.path.join(installspath, pluginname))
-    ok(f'Installed `{pluginname}` successfully!')
+    done = install(pluginname, link, installspath, mirror)
+    ok(f'{done.capitalize()} `{pluginname}` successfully!')
 
 def read_flow_info() -> dict:
     with open(flowinfopath, 'r') as file:
         obj = json.load(file)
     return obj
 
+def load_plugin():
+    info = read_flow_info()
+    
+    # plugin = info['plugins'][info['use-plugin']]
+    plugin = info['use-plugin']
+    
+    sys.path.append(os.path.join(installspath, plugin))
+    return importlib.import_module(f'plugin')
+
+def write_output(cliargs, ast, context, plugin) -> str:
+    from frontend.profiling import phase
+    from utils.logging import checked, reporter
+    from codex import ok
+    
+    # print(context)
+    with phase('plugin'): output, ast, context = plugin.main(ast, context)
+    
+    _, filename = os.path.split(cliargs.filename)
+    filename = filename.split('.')[0]
+    
+    outfile = cliargs.output
+    if cliargs.output is None: outfile = f'{filename}_flow.py'
+    with phase('write'), open(os.path.join(cwd, outfile), 'w') as file:
+        file.write(output)
+    
+    reporter.step(ok, checked(f'Output sucessfully written to `{outfile}`!'))
+    return outfile
+
+def show_chains(file : 'str | Lines', context):
+    for each in context.ichains:
+        print(f'Inference chain for {each}:')
+        show_chain(file, context.ichains[each], context)
+        print()
+
+def captured(job : Callable[[], Any]) -> tuple[int, str]:
+    # runs `job` away from the terminal; returns the exit status and everything it printed
+    log, status = io.StringIO(), 0
+    
+    with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try: job()
+        except SystemExit as e:
+            status = e.code if e.code is not None else 0
+        except Exception as e:
+            print(e)
+            status = -1
+    
+    return status, log.getvalue()
+
 
 def main():
     cliargs = make_cli_parser().parse_args()
     
+    from codex import warning, error, ok
+    
+    if cliargs.quiet:
+        from utils.logging import reporter
+        reporter.quiet = True
+    
     
     #TODO: Put CLI logic here...
     
@@ -70,7 +126,7 @@ def main():
             error('Cannot create plugins.flow.json, likely caused by not enough privilege!')
             sys.exit(-1)
         
-        try : install_plugin(cliargs.install)
+        try : install_plugin(cliargs.install, cliargs.mirror)
         except Exception as e:
             print(e)
             error('Plugin install failed! Exiting...')
@@ -80,51 +136,62 @@ def main():
     
     if cliargs.sync:
         if os.path.exists(flowinfopath):
+            from cli.sync import sync_plugins
+            
             with open(flowinfopath, 'r') as file:
                 original = json.load(file)
             
-            for each in original['plugins']:
-                try: install_plugin(original['plugins'][each])
-                except Exception as e:
-                    print(e)
-                    error('Plugin install failed! Exiting...')
-                    sys.exit(-1)
+            if sync_plugins(original['plugins'], installspath, cliargs.mirror, cliargs.jobs):
+                error('Plugin sync failed! Exiting...')
+                sys.exit(-1)
             
         else:
             error('No plugins.flow.json found! Sync failed, Exiting...')
             sys.exit(-1)
     
-    if cliargs.filename is not None:
-        ast, context = process_file(cliargs)
+    if cliargs.serve is not None:
+        from cli.serve import serve
         
-        if cliargs.debug:
-            with open(cliargs.filename, 'r') as fb:
-                file = fb.read()
-            for each in context.ichains:
-                print(f'Inference chain for {each}:')
-                show_chain(file, context.ichains[each], context)
-                print()
-        
-        info = read_flow_info()
+        serve(cliargs.serve)
+        return
+    
+    if cliargs.filename is not None:
+        from cli.builds import expand, build_files
         
-        # plugin = info['plugins'][info['use-plugin']]
-        plugin = info['use-plugin']
+        files = expand(cliargs.filename)
+        if (len(files) != 1) or (files != cliargs.filename):
+            if cliargs.all_builds or (cliargs.connect is not None) or (cliargs.profile is not None):
+                error('`--all-builds`, `--connect` and `--profile` take a single input file! Exiting...')
+                sys.exit(-1)
+            sys.exit(build_files(files, cliargs))
         
-        sys.path.append(os.path.join(installspath, plugin))
-        plugin = importlib.import_module(f'plugin')
+        cliargs.filename = files[0]
         
-        # print(context)
-        output, ast, context = plugin.main(ast, context)
+        if (cliargs.profile is not None) and (cliargs.all_builds or (cliargs.connect is not None)):
+            error('`--profile` only profiles an in-process compile of a single build! Exiting...')
+            sys.exit(-1)
+    
+    if cliargs.filename is not None and cliargs.connect is not None:
+        from cli.serve import submit
         
-        _, filename = os.path.split(cliargs.filename)
-        filename = filename.split('.')[0]
+        sys.exit(submit(cliargs.connect, cliargs))
+    
+    if cliargs.filename is not None and cliargs.all_builds:
+        from cli.builds import build_all
         
-        outfile = cliargs.output
-        if cliargs.output is None: outfile = f'{filename}_flow.py'
-        with open(os.path.join(cwd, outfile), 'w') as file:
-            file.write(output)
+        sys.exit(build_all(cliargs))
+    
+    if cliargs.filename is not None:
+        from frontend.main import process_file, source, traced
         
-        ok(checked(f'Output sucessfully written to `{outfile}`!'))
+        profile = contextlib.nullcontext()
+        if cliargs.profile is not None:
+            from frontend.profiling import Profiler
+            profile = Profiler(cliargs.profile, cliargs.profile_detail)
         
-    
-    
\ No newline at end of file
+        with profile:
+            ast, context = process_file(cliargs)
+            
+            if cliargs.debug: show_chains(source(ast.file, ast.path), traced(ast, cliargs.build, context))
+            
+            write_output(cliargs, ast, context, load_plugin())
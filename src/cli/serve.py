@@ -0,0 +1,120 @@
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import socketserver, hashlib, pickle, socket, json, os, sys
+
+# `submit` runs in the short-lived client, so the compiler is only imported by the daemon itself.
+if TYPE_CHECKING:
+    from utils.nodes import Program
+
+
+# Requests and responses are single lines of JSON over the socket:
+#   -> {"filename": "/abs/in.fl", "build": null, "output": "/abs/out.py", "debug": false, "quiet": false}
+#   <- {"status": 0, "log": "...everything `flow -f` would have printed..."}
+
+
+class Daemon:
+    '''
+    Compiles jobs against a warm lexer/parser and plugin, keeping the ironed and checked `Program`
+    of recently seen sources keyed by the hash of their contents. Programs are cached pickled and
+    loaded afresh for every job, since building a context and the plugin both mutate the AST.
+    '''
+    def __init__(self, maxsize : int = 64) -> None:
+        self.programs : OrderedDict[str, bytes] = OrderedDict()
+        self.maxsize = maxsize
+        self.plugin = None
+    
+    def program(self, file : str) -> 'Program':
+        from frontend.main import parse_program
+        from utils.logging import reporter
+        
+        key = hashlib.sha256(file.encode()).hexdigest()
+        
+        if key in self.programs:
+            self.programs.move_to_end(key)
+            ast = pickle.loads(self.programs[key])
+            # memoised checks are keyed by the ids of the flows they ran on
+            ast.checked = None
+            reporter.step(print, 'AST loaded from cache...')
+            return ast
+        
+        ast = parse_program(file)
+        # pickle recurses once per level of the AST; programs too deep for it are parsed every time
+        try: self.programs[key] = pickle.dumps(ast)
+        except RecursionError: return ast
+        if len(self.programs) > self.maxsize: self.programs.popitem(last = False)
+        return ast
+    
+    def compile(self, request : dict) -> dict:
+        from frontend.main import read_file, build_context, traced
+        from cli.main import load_plugin, write_output, show_chains, captured
+        from utils.logging import reporter
+        
+        cliargs = SimpleNamespace(
+            filename = request['filename'], build = request.get('build'),
+            output = request.get('output'), debug = request.get('debug', False)
+        )
+        reporter.quiet = request.get('quiet', False)
+        
+        def job() -> None:
+            file = read_file(cliargs.filename)
+            ast = self.program(file)
+            context = build_context(ast, cliargs.build)
+            
+            if cliargs.debug: show_chains(file, traced(ast, cliargs.build, context))
+            
+            if self.plugin is None: self.plugin = load_plugin()
+            write_output(cliargs, ast, context, self.plugin)
+        
+        status, log = captured(job)
+        return {'status' : status, 'log' : log}
+
+
+class Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        try: request = json.loads(self.rfile.readline())
+        except ValueError as e: response = {'status' : -1, 'log' : f'Malformed request: {e}\n'}
+        else: response = self.server.daemon.compile(request)
+        self.wfile.write(json.dumps(response).encode() + b'\n')
+
+
+def serve(path : str) -> None:
+    from codex import warning, ok
+    import frontend.main # warms the lexer and parser before the first job
+    
+    if os.path.exists(path): os.unlink(path)
+    
+    # jobs run one at a time; they share the command line session, its spinner and the plugin
+    with socketserver.UnixStreamServer(path, Handler) as server:
+        os.chmod(path, 0o600)
+        server.daemon = Daemon()
+        ok(f'Serving compile jobs on `{path}`...')
+        try: server.serve_forever()
+        except KeyboardInterrupt: warning('Shutting down...')
+        finally: os.unlink(path)
+
+
+def submit(path : str, cliargs) -> int:
+    from codex import error
+    
+    filename = os.path.abspath(cliargs.filename)
+    outfile = cliargs.output
+    if outfile is None: outfile = f'{os.path.split(filename)[1].split(".")[0]}_flow.py'
+    
+    request = {
+        'filename' : filename, 'build' : cliargs.build,
+        'output' : os.path.abspath(outfile), 'debug' : cliargs.debug, 'quiet' : cliargs.quiet
+    }
+    
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try: sock.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            error(f'No compile daemon listening on `{path}`! Start one with `flow --serve`.')
+            return -1
+        
+        sock.sendall(json.dumps(request).encode() + b'\n')
+        response = json.loads(sock.makefile('rb').readline())
+    
+    sys.stdout.write(response['log'])
+    return response['status']
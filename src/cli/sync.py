@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import hashlib, io, os
+
+
+# Plugins are fetched at depth 1, several at a time: the work is waiting on the network and the disk.
+# With a mirror directory, each remote is first cloned or fast-forwarded there, once per URL, and the
+# plugins are installed from the mirror; keep it between CI runs and only new commits are downloaded.
+
+
+def fetch(source : str, target : str) -> str:
+    '''Clones `source` into `target` at depth 1, or fast-forwards `target` if it exists; returns which it did.'''
+    from dulwich import porcelain
+    
+    # progress from concurrent fetches would interleave; outcomes are reported by the caller
+    quiet = io.BytesIO()
+    if os.path.exists(target):
+        porcelain.pull(target, source, outstream = quiet, errstream = quiet)
+        return 'updated'
+    
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok = True)
+    with porcelain.clone(source, target, depth = 1, errstream = quiet): pass
+    return 'installed'
+
+
+def mirrored(url : str, mirror : str) -> str:
+    # named after the repository for humans, and the URL's hash so forks don't collide
+    name = os.path.basename(urlparse(url).path.rstrip('/')).removesuffix('.git')
+    return os.path.join(mirror, f'{name}-{hashlib.sha256(url.encode()).hexdigest()[:12]}')
+
+
+def install(name : str, url : str, installspath : str, mirror : str = None) -> str:
+    source = url
+    if mirror is not None:
+        source = mirrored(url, mirror)
+        fetch(url, source)
+    return fetch(source, os.path.join(installspath, name))
+
+
+def sync_plugins(plugins : dict[str, str], installspath : str, mirror : str = None, jobs : int = None) -> int:
+    '''Installs or updates every plugin in `plugins` (name to URL) concurrently, reporting each; returns how many failed.'''
+    from codex import ok, error
+    
+    if not plugins: return 0
+    failed = 0
+    
+    # every URL is mirrored once, before the plugins using it are installed from it
+    urls = list(dict.fromkeys(plugins.values()))
+    with ThreadPoolExecutor(max_workers = max(1, min(jobs or 8, len(plugins)))) as pool:
+        broken = dict()
+        if mirror is not None:
+            pending = {pool.submit(fetch, url, mirrored(url, mirror)) : url for url in urls}
+            for job in as_completed(pending):
+                if job.exception() is not None: broken[pending[job]] = job.exception()
+        
+        pending = {
+            pool.submit(fetch, mirrored(url, mirror) if mirror is not None else url, os.path.join(installspath, name)) : name
+            for name, url in plugins.items() if url not in broken
+        }
+        for name, url in plugins.items():
+            if url not in broken: continue
+            print(broken[url])
+            error(f'Failed to sync `{name}` from `{url}`!')
+            failed += 1
+        
+        for job in as_completed(pending):
+            name = pending[job]
+            if job.exception() is None:
+                ok(f'{job.result().capitalize()} `{name}` successfully!')
+                continue
+            
+            print(job.exception())
+            error(f'Failed to sync `{name}` from `{plugins[name]}`!')
+            failed += 1
+    
+    return failed
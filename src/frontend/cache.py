@@ -0,0 +1,265 @@
+from frontend.middle import Context, link_flow, link_calls, unbound
+from frontend.stream import blockpattern, commentpattern, parse_definition, shift
+from utils.nodes import *
+
+from typing import Callable, Iterable
+
+import hashlib, pickle, os, io
+
+
+
+def blocks(file : str) -> list[tuple[int, int]] | None:
+    '''
+    Spans of the top-level definitions of `file`, each running from the end of the previous one to its
+    closing brace. None when the braces don't balance or anything but comments trails the last one.
+    '''
+    spans, depth, start = [], 0, 0
+    for match in blockpattern.finditer(file):
+        if match.group() == '{': depth += 1
+        elif match.group() == '}':
+            depth -= 1
+            if depth < 0: return None
+            if depth == 0:
+                spans.append((start, match.end()))
+                start = match.end()
+    
+    if (depth != 0) or (not spans) or commentpattern.sub('', file[start:]).strip(): return None
+    return spans
+
+
+def stamp() -> str:
+    # cached entries are only valid for the compiler that wrote them
+    files = [
+        os.path.join(os.path.dirname(__file__), each)
+        for each in ['lexy.py', 'percy.py', 'parsetab.py', 'middle.py', 'stream.py', 'cache.py']
+    ] + [os.path.join(os.path.dirname(os.path.dirname(__file__)), 'utils', 'nodes.py')]
+    return repr([(os.stat(each).st_size, os.stat(each).st_mtime_ns) for each in files])
+
+
+def digest(*parts : Any) -> str:
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+
+class Pickler(pickle.Pickler):
+    # flows and the program are stored by reference, and bound to the current program when loaded;
+    # the solvers' `unbound` marker has to stay the module's own object
+    def __init__(self, file : io.BytesIO, program : Program, instances : dict) -> None:
+        super().__init__(file)
+        self.program = program
+        self.instances = instances
+    
+    def persistent_id(self, obj : Any) -> tuple | None:
+        if obj is self.program: return ('program',)
+        if obj is self.instances: return ('instances',)
+        if obj is unbound: return ('unbound',)
+        if type(obj) == FlowDef: return ('flow', obj.name)
+        return None
+
+
+class Unpickler(pickle.Unpickler):
+    def __init__(self, file : io.BytesIO, program : Program) -> None:
+        super().__init__(file)
+        self.program = program
+        self.instances = dict()
+    
+    def persistent_load(self, pid : tuple) -> Any:
+        if pid[0] == 'program': return self.program
+        if pid[0] == 'instances': return self.instances
+        if pid[0] == 'unbound': return unbound
+        return self.program.getflow(pid[1])
+
+
+
+class FlowCache:
+    '''
+    On-disk incremental cache for `process_file`, kept under `root`.
+    
+    The source is split into its top-level definitions; each is parsed and ironed on its own and stored
+    by the hash of its text (`ast/`). A flow is fingerprinted by its text and that of every subflow it
+    depends on, and skips its semantic check when that fingerprint passed before (`checked/`). A build
+    additionally fingerprints the positions of those definitions, which its inference chains refer to,
+    and reloads its baked context instead of re-running shape inference (`shapes/`).
+    '''
+    def __init__(self, root : str = '.flowcache') -> None:
+        self.root = root
+        self.stamp = stamp()
+        self.spans : dict[int, tuple[str, int, int]] = dict()
+        self.checks : dict[int, str] = dict()
+        for each in ['ast', 'checked', 'shapes']:
+            os.makedirs(os.path.join(root, each), exist_ok = True)
+    
+    def path(self, kind : str, key : str) -> str:
+        return os.path.join(self.root, kind, key)
+    
+    def read(self, kind : str, key : str) -> bytes | None:
+        try:
+            with open(self.path(kind, key), 'rb') as file: return file.read()
+        except OSError: return None
+    
+    def write(self, kind : str, key : str, data : bytes) -> None:
+        # written aside and renamed, so concurrent compiles never read a partial entry
+        path = self.path(kind, key)
+        temp = f'{path}.{os.getpid()}'
+        with open(temp, 'wb') as file: file.write(data)
+        os.replace(temp, path)
+    
+    
+    def parse(self, file : str, parse : Callable = parse_definition) -> Program | None:
+        '''Parses and irons `file` one definition at a time; None if it can't be split or a definition doesn't parse.'''
+        spans = blocks(file)
+        if spans is None: return None
+        
+        def pieces() -> Iterable[tuple[str, int, int]]:
+            line = 1
+            for start, end in spans:
+                yield file[start : end], line, start
+                line += file[start : end].count('\n')
+        
+        return self.parse_definitions(pieces(), parse, file = file)
+    
+    def parse_definitions(
+        self, pieces : Iterable[tuple[str, int, int]], parse : Callable = parse_definition, **program : str
+    ) -> Program | None:
+        '''
+        Parses and irons each definition's text, given with the line and character it starts at (see
+        `frontend.stream.definitions`), with `parse`; None if one doesn't parse. `program` sets the `file` or `path`.
+        '''
+        definitions = []
+        for text, line, start in pieces:
+            key = digest(self.stamp, text)
+            
+            node = None
+            data = self.read('ast', key)
+            if data is not None:
+                try: node = pickle.loads(data)
+                except Exception: node = None
+            
+            if node is None:
+                try: node = parse(text)
+                except Exception: return None
+                # pickle recurses once per level of the tree; definitions too deep for it go uncached
+                try: self.write('ast', key, pickle.dumps(node))
+                except RecursionError: pass
+            
+            shift(node, line - 1, start)
+            self.spans[id(node)] = (key, line, start)
+            definitions.append(node)
+        
+        return Program(
+            name = None,
+            flows = list(filter(lambda x: type(x) == FlowDef, definitions)),
+            builds = list(filter(lambda x: type(x) == Build, definitions)),
+            **program
+        )
+    
+    
+    def deps(self, flow : FlowDef, program : Program) -> list[FlowDef | None]:
+        # the flows `flow` declares with `let`, None for the ones that don't exist
+        return [program.getflow(stmt.flow) for stmt in flow.body.statements if type(stmt) == Let]
+    
+    def fingerprints(self, program : Program) -> dict[int, str | None]:
+        '''
+        Fingerprint of every flow of `program`, from its text and the fingerprints of the flows it declares
+        with `let`. Mutually recursive flows, the strongly connected components of that graph (Tarjan's
+        algorithm, run iteratively), share one. None for flows depending on a missing or unsplit flow.
+        '''
+        deps = {id(flow) : self.deps(flow, program) for flow in program.flows}
+        index, low, onstack, stack, prints = dict(), dict(), set(), [], dict()
+        
+        def visit(flow : FlowDef) -> None:
+            index[id(flow)] = low[id(flow)] = len(index)
+            stack.append(flow)
+            onstack.add(id(flow))
+            work.append((flow, iter(deps[id(flow)])))
+        
+        for root in program.flows:
+            if id(root) in index: continue
+            work = []
+            visit(root)
+            
+            while work:
+                flow, pending = work[-1]
+                for sub in pending:
+                    if sub is None: continue
+                    if id(sub) not in index:
+                        visit(sub)
+                        break
+                    if id(sub) in onstack: low[id(flow)] = min(low[id(flow)], index[id(sub)])
+                else:
+                    work.pop()
+                    if work: low[id(work[-1][0])] = min(low[id(work[-1][0])], low[id(flow)])
+                    if low[id(flow)] != index[id(flow)]: continue
+                    
+                    component = []
+                    while not component or (component[-1] is not flow):
+                        component.append(stack.pop())
+                        onstack.discard(id(component[-1]))
+                    
+                    members = {id(x) for x in component}
+                    outside = [d for x in component for d in deps[id(x)] if (d is None) or (id(d) not in members)]
+                    if any((d is None) or (prints[id(d)] is None) for d in outside) or any(id(x) not in self.spans for x in component):
+                        fingerprint = None
+                    else:
+                        fingerprint = digest(
+                            self.stamp, sorted(self.spans[id(x)][0] for x in component), sorted(prints[id(d)] for d in outside)
+                        )
+                    for x in component: prints[id(x)] = fingerprint
+        
+        return prints
+    
+    
+    def link(self, program : Program) -> None:
+        '''Marks every flow of `program` whose fingerprint passed the semantic check before as checked.'''
+        if program.checked is None: program.checked = dict()
+        self.checks = self.fingerprints(program)
+        for flow in program.flows:
+            key = self.checks[id(flow)]
+            if (key is not None) and os.path.exists(self.path('checked', key)):
+                link_flow(flow, program)
+                program.checked[id(flow)] = None
+    
+    def passed(self, program : Program) -> None:
+        '''Records that the flows of `program` passed the semantic check.'''
+        for key in set(self.checks.values()):
+            if (key is not None) and not os.path.exists(self.path('checked', key)): self.write('checked', key, b'')
+    
+    
+    def closure(self, flow : FlowDef, program : Program) -> list[FlowDef] | None:
+        # `flow` first, then every flow it transitively declares with `let`
+        found, stack = {id(flow) : flow}, [flow]
+        while stack:
+            for sub in self.deps(stack.pop(), program):
+                if sub is None: return None
+                if id(sub) not in found:
+                    found[id(sub)] = sub
+                    stack.append(sub)
+        return list(found.values())
+    
+    def shapekey(self, build : Build, program : Program) -> str | None:
+        deps = self.closure(build.flow, program)
+        if (deps is None) or any(id(x) not in self.spans for x in [build] + deps): return None
+        return digest(self.stamp, self.spans[id(build)], sorted(self.spans[id(x)] for x in deps))
+    
+    def restore(self, build : Build, program : Program) -> tuple[Build, Context] | None:
+        '''Loads the baked context of `build`, swapping the build it was inferred from into `program`.'''
+        key = self.shapekey(build, program)
+        data = self.read('shapes', key) if key is not None else None
+        if data is None: return None
+        
+        try: restored, context = Unpickler(io.BytesIO(data), program).load()
+        except Exception: return None
+        
+        program.builds = [restored if each is build else each for each in program.builds]
+        link_calls(restored.flow, program)
+        return restored, context
+    
+    def store(self, build : Build, context : Context, program : Program) -> None:
+        key = self.shapekey(build, program)
+        if key is None: return
+        
+        data = io.BytesIO()
+        # as for definitions, contexts nested too deep to pickle go uncached
+        try: Pickler(data, program, context.instances).dump((build, context))
+        except RecursionError: return
+        self.write('shapes', key, data.getvalue())
@@ -0,0 +1,177 @@
+from frontend.lexy import lexer
+from frontend.percy import parser
+from frontend.middle import *
+from frontend.cache import FlowCache
+from frontend.stream import definitions, parse_text, parse_definition, parse_stream
+from frontend.profiling import phase
+from utils.logging import Reporter, reporter
+from utils.nodes import *
+
+import copy
+
+
+# The compiler proper, for use as a library. Nothing here prints or exits: every stage raises the error
+# it failed with, tagged with the stage (`syntax`, `flow`, `build`, `select` or `shape`) and the flow
+# or build it failed in. `frontend.main` drives the same stages for the command line.
+#
+# The parse stages run on a `CompilerSession`'s lexer and parser, the process's `shared` one by default;
+# everything after parsing only touches the program being compiled.
+
+
+
+def tag(e : Exception, stage : str, scope : str = None) -> Exception:
+    e.stage, e.scope = stage, scope
+    return e
+
+
+def parse_source(file : str, cache : FlowCache = None, session : 'CompilerSession' = None) -> Program:
+    session = session or shared
+    with phase('parse'):
+        ast = cache.parse(file, session.parse_definition) if cache is not None else None
+        if ast is not None: return ast
+        
+        try: ast = parse_text(file, 1, session.lexer, session.parser)
+        except Exception as e:
+            tag(e, 'syntax')
+            raise
+    
+    ast = Program(
+        name = None,
+        flows = list(filter(lambda x: type(x) == FlowDef, ast)),
+        builds = list(filter(lambda x: type(x) == Build, ast)),
+        file = file
+    )
+    with phase('iron'): return iron(ast)
+
+
+def parse_file(path : str, cache : FlowCache = None, session : 'CompilerSession' = None) -> Program:
+    # `parse_source` for files too large to read whole; parsing and ironing go definition by definition
+    session = session or shared
+    with phase('parse'):
+        ast = None
+        if cache is not None: ast = cache.parse_definitions(definitions(path), session.parse_definition, path = path)
+        if ast is not None: return ast
+        
+        try: return parse_stream(path, parse = session.parse_definition)
+        except Exception as e:
+            tag(e, 'syntax')
+            raise
+
+
+def check_flows(program : Program, callback : Callable = None, cache : FlowCache = None) -> None:
+    # `callback` sees every flow, then each of its statements, as it is checked
+    with phase('check_flows'):
+        if cache is not None: cache.link(program)
+        
+        for flow in program.flows:
+            if callback: callback(flow)
+            try: semantic_check_flow(flow, program, callback = callback)
+            except Exception as e:
+                tag(e, 'flow', flow.name)
+                raise
+        
+        if cache is not None: cache.passed(program)
+
+
+def check_builds(program : Program, callback : Callable = None) -> None:
+    with phase('check_builds'):
+        for build in program.builds:
+            if callback: callback(build)
+            try: semantic_check_build(build, program, callback = callback)
+            except Exception as e:
+                tag(e, 'build', build.name)
+                raise
+
+
+def select_build(program : Program, name : str = None) -> Build:
+    # the last build in the file by default; a build shadows earlier ones of the same name
+    for build in program.builds[::-1]:
+        if (name is None) or (build.name == name): return build
+    
+    if name is None: raise tag(UnknownBuild(f'No build found!'), 'select')
+    raise tag(UnknownBuild(f'Cannot find build `{name}`!'), 'select', name)
+
+
+def check_shapes(build : Build, context : Context) -> None:
+    try:
+        with phase('flowlengths_flow'): run(flowlengths_flow, build.flow, context)
+        with phase('seed_shapes'): context.seed_shapes()
+        with phase('flowshape_flow'): run(flowshape_flow, build.flow, context)
+        with phase('bake'): context.bake()
+    except Exception as e:
+        tag(e, 'shape', build.name)
+        raise
+
+
+def shape_build(program : Program, build : Build, cache : FlowCache = None) -> Context:
+    if cache is not None:
+        with phase('restore'): restored = cache.restore(build, program)
+        if restored is not None: return restored[1]
+    
+    with phase('contextfrombuild'): context = contextfrombuild(build, program)
+    check_shapes(build, context)
+    if cache is not None:
+        with phase('store'): cache.store(build, context, program)
+    
+    return context
+
+def trace_build(program : Program, build : Build, compact : bool = True) -> tuple[Context, Exception | None]:
+    '''
+    Shapes `build` again, recording the inference chains that shaping skips (see `Chains`); returns the
+    context and what shaping failed with, if anything. For `-d` and for errors to show, so only run then.
+    '''
+    context = contextfrombuild(build, program, Chains(compact))
+    try: check_shapes(build, context)
+    except Exception as e: return context, e
+    return context, None
+
+
+
+class CompilerSession:
+    '''
+    A lexer and parser of its own, sharing the generated tables with every other session, and a `Reporter`
+    for progress and the lexer's warnings (quiet by default). Sessions share no state, so a thread pool can run one compile per
+    session at once; a session runs one at a time. Unknowns are numbered per build, from 0, in any session.
+    '''
+    def __init__(self, reporter : Reporter = None) -> None:
+        self.lexer = lexer.clone()
+        self.parser = copy.copy(parser)
+        self.reporter = reporter if reporter is not None else Reporter(quiet = True)
+        self.lexer.warn = lambda message : self.reporter.step(print, message)
+    
+    def parse_definition(self, text : str, line : int = 1) -> FlowDef | Build:
+        return parse_definition(text, line, self.lexer, self.parser)
+    
+    def progress(self, node : FlowDef | Build | Statement) -> None:
+        if type(node) == FlowDef: self.reporter(lambda fl : f'Checking flow `{fl.name}`...', node)
+        elif type(node) == Build: self.reporter(lambda fl : f'Checking build `{fl.name}`...', node)
+        else: self.reporter(lambda x: f'Line no. {x.line}...', node)
+    
+    def compile(self, file : str, build : str = None, cache : FlowCache = None) -> tuple[Program, Context]:
+        '''`compile_source` on this session.'''
+        callback = self.progress if not self.reporter.quiet else None
+        try:
+            program = parse_source(file, cache, self)
+            check_flows(program, callback, cache)
+            check_builds(program, callback)
+            return program, shape_build(program, select_build(program, build), cache)
+        except CodeError: raise
+        except Exception as e:
+            raise tag(
+                InternalError(f'{type(e).__name__}: {e}'), getattr(e, 'stage', None), getattr(e, 'scope', None)
+            ) from e
+
+# the session of the command line, reporting to its spinner, and of the stages called without one
+shared = CompilerSession(reporter)
+
+
+
+def compile_source(file : str, build : str = None, cache : FlowCache = None) -> tuple[Program, Context]:
+    '''
+    Parses, checks and infers the shapes of the source `file`, for `build` (the last one by default).
+    
+    Raises a `CodeError` on failure, with `line`, `stage` and `scope` set; anything unexpected is
+    wrapped in an `InternalError`. Prints nothing, so it can be called any number of times in one
+    process, and from several threads at once: each call runs on a `CompilerSession` of its own.
+    '''
+    return CompilerSession().compile(file, build, cache)
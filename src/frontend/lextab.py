@@ -0,0 +1,10 @@
+# lextab.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('BUILD', 'COLON', 'COMMA', 'DIVIDE', 'DOT', 'EQUALS', 'FLOW', 'GT', 'IDENTIFIER', 'LBRACE', 'LBRACKET', 'LET', 'LPAREN', 'LT', 'MATMUL', 'MINUS', 'MUL', 'NUMBER', 'PLUS', 'RBRACE', 'RBRACKET', 'RETURN', 'RPAREN', 'SEMICOLON'))
+_lexreflags   = 64
+_lexliterals  = ''
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_IDENTIFIER>[a-zA-Z_][a-zA-Z_0-9]*)|(?P<t_NUMBER>-?\\d+(\\.\\d+)?)|(?P<t_newline>\\n+)|(?P<t_comment>//.*)|(?P<t_DOT>\\.)|(?P<t_LBRACE>\\{)|(?P<t_LBRACKET>\\[)|(?P<t_LPAREN>\\()|(?P<t_MUL>\\*)|(?P<t_PLUS>\\+)|(?P<t_RBRACE>\\})|(?P<t_RBRACKET>\\])|(?P<t_RPAREN>\\))|(?P<t_COLON>:)|(?P<t_COMMA>,)|(?P<t_DIVIDE>/)|(?P<t_EQUALS>=)|(?P<t_GT>>)|(?P<t_LT><)|(?P<t_MATMUL>@)|(?P<t_MINUS>-)|(?P<t_SEMICOLON>;)', [None, ('t_IDENTIFIER', 'IDENTIFIER'), ('t_NUMBER', 'NUMBER'), None, ('t_newline', 'newline'), ('t_comment', 'comment'), (None, 'DOT'), (None, 'LBRACE'), (None, 'LBRACKET'), (None, 'LPAREN'), (None, 'MUL'), (None, 'PLUS'), (None, 'RBRACE'), (None, 'RBRACKET'), (None, 'RPAREN'), (None, 'COLON'), (None, 'COMMA'), (None, 'DIVIDE'), (None, 'EQUALS'), (None, 'GT'), (None, 'LT'), (None, 'MATMUL'), (None, 'MINUS'), (None, 'SEMICOLON')])]}
+_lexstateignore = {'INITIAL': ' \t'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
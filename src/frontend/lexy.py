@@ -1,5 +1,6 @@
 import ply.lex as lex
 
+
 tokens = [
     'IDENTIFIER', 'NUMBER', 'PLUS', 'MINUS', 'MUL', 'DIVIDE', 'MATMUL',
     'LPAREN', 'RPAREN', 'LBRACKET', 'RBRACKET', 'LBRACE', 'RBRACE', 'SEMICOLON',
@@ -59,11 +60,17 @@ def t_comment(t):
 
 # Error handling rule
 def t_error(t):
-    print(f"Illegal character '{t.value[0]}' on line {t.lineno}!")
+    # skipped with a warning, through the lexer's `warn`: sessions of the library API stay silent
+    t.lexer.warn(f"Illegal character '{t.value[0]}' on line {t.lineno}!")
     t.lexer.skip(1)
 
 
 
-# Build the lexer
-lexer : lex.Lexer = lex.lex()
+# Build the lexer, from the tables shipped in `frontend/lextab.py` (see `frontend/tables.py`). Without
+# them it is built from the rules above instead: PLY writes the table of an optimized lexer it had to
+# build, and nothing is written at runtime.
+try: from frontend import lextab
+except ImportError: lextab = None
+lexer : lex.Lexer = lex.lex(optimize = lextab is not None, lextab = lextab)
+lexer.warn = print
 
@@ -1,9 +1,7 @@
-import sys
+import sys, os
 
-from frontend.lexy import lexer
-from frontend.percy import parser
-from frontend.middle import *
-from utils.nodes import *
+from frontend.compiler import *
+from frontend.profiling import phase
 from utils.logging import *
 from cli import *
 
@@ -14,96 +12,110 @@ from codex import dblog, error, ok, warning
 
 
 
-def check_flows(program : Program):
-    def callback(stmt : Statement):
-        loading(lambda x: f'Line no. {x.line}...', stmt)
-    
-    for flow in program.flows:
-        loading(lambda fl : f'Checking flow `{fl.name}`...', flow)
-        try : semantic_check_flow(flow, program, callback=callback)
-        except Exception as e:
-            show_error(f'Semantic check failed in flow `{flow.name}`!', e, program.file)
-            sys.exit(-1)
+# The command line front of `frontend.compiler`: reports progress, and shows the error a stage failed with before exiting.
 
+# files larger than this are parsed as they are read, and never held in memory whole
+streamsize = 32 << 20
 
-def check_builds(program : Program):
-    def callback(stmt : Statement):
-        loading(lambda x: f'Line no. {x.line}...', stmt)
-    
-    for build in program.builds:
-        loading(lambda fl : f'Checking build `{fl.name}`...', build)
-        try : semantic_check_build(build, program, callback=callback)
-        except Exception as e:
-            show_error(f'Semantic check failed in build `{build.name}`!', e, program.file)
-            sys.exit(-1)
+messages = {
+    'syntax' : lambda scope : 'Syntax error!',
+    'flow' : lambda scope : f'Semantic check failed in flow `{scope}`!',
+    'build' : lambda scope : f'Semantic check failed in build `{scope}`!',
+    'select' : lambda scope : f'Nothing to build!',
+    'shape' : lambda scope : f'Shape check failed in `{scope}`',
+}
 
+def fail(e : Exception, file : str):
+    stage = getattr(e, 'stage', None)
+    show_error(messages[stage](e.scope) if stage in messages else 'Compilation failed!', e, file)
+    sys.exit(-1)
 
-def check_shapes(build : Build, context : Context):
-    try:
-        flowlengths_flow(build.flow, context)
-        context.seed_shapes()
-        flowshape_flow(build.flow, context)
-        context.bake()
-    except Exception as e:
-        show_error(f'Shape check failed in `{build.name}`', e, context.program.file)
-        sys.exit(-1)
 
-
-
-
-def process_file(cliargs) -> tuple[Program, Context]:
-    # cliargs = make_cli_parser().parse_args()
-    
+def read_file(filename : str) -> str:
     try:
-        with open(cliargs.filename, 'r') as fb:
+        with phase('read'), open(filename, 'r') as fb:
             file = (fb.read())
         
         if not file:
             print('Empty input file! Exiting...')
             exit(0)
         
-        print(('File read...'))
+        reporter.step(print, 'File read...')
     except FileNotFoundError:
-        error(f'Cannot find file `{cliargs.filename}`!')
+        error(f'Cannot find file `{filename}`!')
         sys.exit(-1)
     
+    return file
+
+
+def source(file : str | None, path : str = None) -> str | Lines:
+    # streamed programs keep only their `path`; errors and inference chains map the file instead
+    return file if file is not None else Lines.open(path)
+
+
+def parse_program(file : str | None, cache : FlowCache = None, path : str = None) -> Program:
+    '''Parses, irons and checks the source `file`, or streams the file at `path` when `file` is None.'''
     try:
-        lexer.input(file)
-        ast = parser.parse(file, lexer = lexer, tracking = True)
-    except Exception as e:
-        show_error(f'Syntax error!', e, file)
-        sys.exit(-1)
+        ast = parse_source(file, cache) if file is not None else parse_file(path, cache)
+        reporter.step(print, 'AST constructed...')
+        reporter.step(print, 'AST ironed...')
         
+        
+        check_flows(ast, shared.progress, cache)
+        reporter.step(ok, checked('Flows semantically checked...'))
+        
+        
+        check_builds(ast, shared.progress)
+        reporter.step(ok, checked('Builds semantically checked...'))
+    except Exception as e: fail(e, source(file, path))
     
-    print(('AST constructed...'))
-    
-    ast = Program(
-        name = None,
-        flows = list(filter(lambda x: type(x) == FlowDef, ast)),
-        builds = list(filter(lambda x: type(x) == Build, ast)),
-        file = file
-    )
-    ast = iron(ast)
-    print(('AST ironed...'))
-    
+    return ast
+
+
+def load_program(filename : str, cache : FlowCache = None) -> Program:
+    try: size = os.path.getsize(filename)
+    except OSError: size = 0
     
-    check_flows(ast)
-    ok(checked('Flows semantically checked...'))
+    if size <= streamsize: return parse_program(read_file(filename), cache)
     
+    reporter.step(print, 'Streaming file...')
+    return parse_program(None, cache, filename)
+
+
+def build_context(ast : Program, build : str | None, cache : FlowCache = None) -> Context:
+    try:
+        build = select_build(ast, build)
+        reporter.step(warning, f'Building from `{build.name}`...')
+        context = shape_build(ast, build, cache)
+    except Exception as e:
+        if (getattr(e, 'stage', None) == 'shape') and isinstance(e, CodeError) and (e.ichain is None):
+            e.ichain = failed_chain(ast, build, e)
+        fail(e, source(ast.file, ast.path))
     
-    check_builds(ast)
-    ok(checked('Builds semantically checked...'))
+    reporter.step(ok, checked('Context successfully built...'))
+    return context
+
+
+def failed_chain(ast : Program, build : Build, e : CodeError) -> InferenceChain | None:
+    # shaping records no chains; the failed build is shaped again with them, for the chain through the error's line
+    if e.line is None: return None
+    try: context, _ = trace_build(ast, build)
+    except Exception: return None
+    return context.chains.at(e.line)
+
+
+def traced(ast : Program, build : str | None, context : Context) -> Context:
+    '''`context`, or if it was shaped without inference chains (as by default), its build shaped again with them.'''
+    if context.chains is not None: return context
+    return trace_build(ast, select_build(ast, build))[0]
+
+
+def process_file(cliargs) -> tuple[Program, Context]:
+    # cliargs = make_cli_parser().parse_args()
     
-    build = cliargs.build
-    if build is None: build = ast.builds[-1]
-    else:
-        for each in ast.builds:
-            if each.name == build:
-                build = each
-    warning(f'Building from `{build.name}`...')
-    context = contextfrombuild(build, ast)
-    ok(checked('Context successfully built...'))
+    cache = FlowCache(cliargs.cache) if getattr(cliargs, 'cache', None) else None
     
-    check_shapes(build, context)
+    ast = load_program(cliargs.filename, cache)
+    context = build_context(ast, cliargs.build, cache)
     
     return ast, context
\ No newline at end of file
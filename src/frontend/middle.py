@@ -1,57 +1,228 @@
-from typing import Callable
+from typing import Callable, Generator, Iterable, Iterator
 from utils.nodes import *
 from codex import dblog, warning, ok, error
 
+from array import array
+
 import json
 
 
 
 
+unbound = object()
+
+class DimSolver:
+    '''
+    Disjoint-set forest over the unknowns (`Dimension`s or `ShapeLength`s) of a build.
+    
+    Every unknown is allocated by the solver, and its `id` indexes the parallel `parent`,
+    `rank` and `bound` arrays. `find` compresses paths and `union` merges by rank; the root
+    of a set may additionally be bound to a concrete value (or to an unknown of the other kind).
+    '''
+    def __init__(self, kind : type[Dimension] | type[ShapeLength]) -> None:
+        self.kind = kind
+        self.unknowns : list[Dimension | ShapeLength] = []
+        self.parent : list[int] = []
+        self.rank : list[int] = []
+        self.bound : list = []
+    
+    def new(self) -> Dimension | ShapeLength:
+        index = len(self.parent)
+        unk = self.kind(index)
+        self.unknowns.append(unk)
+        self.parent.append(index)
+        self.rank.append(0)
+        self.bound.append(unbound)
+        return unk
+    
+    def find(self, index : int) -> int:
+        parent = self.parent
+        root = index
+        while parent[root] != root: root = parent[root]
+        while parent[index] != root:
+            parent[index], index = root, parent[index]
+        return root
+    
+    def resolve(self, unk : Dimension | ShapeLength) -> Any:
+        root = self.find(unk.id)
+        value = self.bound[root]
+        return self.unknowns[root] if value is unbound else value
+    
+    def bind(self, unk : Dimension | ShapeLength, value : Any) -> None:
+        self.bound[self.find(unk.id)] = value
+    
+    def union(self, a : Dimension | ShapeLength, b : Dimension | ShapeLength) -> Dimension | ShapeLength:
+        ra, rb = self.find(a.id), self.find(b.id)
+        if ra == rb: return self.unknowns[ra]
+        if self.rank[ra] < self.rank[rb]: ra, rb = rb, ra
+        self.parent[rb] = ra
+        if self.rank[ra] == self.rank[rb]: self.rank[ra] += 1
+        return self.unknowns[ra]
+    
+    def __len__(self) -> int: return len(self.unknowns)
+    def __getitem__(self, k : int) -> Any: return self.resolve(self.unknowns[k])
+    def __iter__(self): return (self.resolve(x) for x in self.unknowns)
+    
+    def __repr__(self) -> str:
+        return str(list(self))
+
+
+def symkey(key : Var | Symbol | Arg | str) -> str:
+    return key.name if isinstance(key, Var) else key
+
+class SymbolTable(dict):
+    '''
+    `dict` keyed on symbol names; `'x'`, `Var('x')`, `Symbol('x')` and `Arg('x')` all share one slot,
+    so lookups hash a plain `str` instead of going through `Var.__hash__`/`Var.__eq__`. Like a `dict`
+    of `Var`s, it keeps the first key set for each name, and iterating it gives that key back: plugins
+    tell inputs (`Symbol`), parameters (`Arg`) and locals (`Var`) apart by it.
+    '''
+    def __init__(self, items : dict = None) -> None:
+        super().__init__()
+        self.originals : dict[str, Var | Symbol | Arg | str] = dict()
+        if items is not None:
+            for k, v in items.items(): self[k] = v
+    
+    def __getitem__(self, key : Var | Symbol | Arg | str) -> Any:
+        return dict.__getitem__(self, symkey(key))
+    
+    def __setitem__(self, key : Var | Symbol | Arg | str, value : Any) -> None:
+        name = symkey(key)
+        if name not in self.originals: self.originals[name] = key
+        dict.__setitem__(self, name, value)
+    
+    def __delitem__(self, key : Var | Symbol | Arg | str) -> None:
+        dict.__delitem__(self, symkey(key))
+        del self.originals[symkey(key)]
+    
+    def __contains__(self, key : Var | Symbol | Arg | str) -> bool:
+        return dict.__contains__(self, symkey(key))
+    
+    def get(self, key : Var | Symbol | Arg | str, default : Any = None) -> Any:
+        return dict.get(self, symkey(key), default)
+    
+    def clear(self) -> None:
+        dict.clear(self)
+        self.originals.clear()
+    
+    def __iter__(self) -> Iterator[Var | Symbol | Arg | str]:
+        return iter(self.originals.values())
+    
+    def keys(self) -> Iterable[Var | Symbol | Arg | str]:
+        return self.originals.values()
+    
+    def items(self) -> Iterator[tuple[Var | Symbol | Arg | str, Any]]:
+        # both are in insertion order, and lose their entries together
+        return zip(self.originals.values(), dict.values(self))
+    
+    def __reduce__(self) -> tuple:
+        # a `dict` subclass is unpickled by setting its items before its attributes, `originals` included
+        return (SymbolTable, (dict(self.items()),))
+
+
+class Chains:
+    '''
+    Inference chains of a context tree: every shape inferred for each variable of each context, with the
+    line it was inferred on. Only recorded when asked for (`-d`, or an error to show), by shaping the build
+    again. `compact` keeps each inference as its chain's index and its line in flat arrays, beside a list
+    of the shapes, instead of a tuple in a chain per variable; the chains are rebuilt when read.
+    '''
+    def __init__(self, compact : bool = False) -> None:
+        self.compact = compact
+        self.keys : dict[tuple[int, str], int] = dict()
+        self.owners : list[tuple[Context, Var]] = []
+        self.chains : list[InferenceChain] = []
+        
+        # compact: the key, line (-1 for none) and shape of every inference, in order
+        self.key, self.line = array('q'), array('q')
+        self.shapes : list['Shape | Context'] = []
+    
+    def push(self, context : 'Context', var : Var, line : int | None, shape : 'Shape | Context') -> None:
+        k = self.keys.get((id(context), var.name))
+        if k is None:
+            # `owners` keeps the context alive, so its id is never reused
+            k = self.keys[id(context), var.name] = len(self.owners)
+            self.owners.append((context, var))
+            if not self.compact: self.chains.append(InferenceChain())
+        
+        if not self.compact:
+            self.chains[k].push((line, shape))
+            return
+        
+        self.key.append(k)
+        self.line.append(line if line is not None else -1)
+        self.shapes.append(shape)
+    
+    def read(self, keys : list[int]) -> dict[int, InferenceChain]:
+        if not self.compact: return {k : self.chains[k] for k in keys}
+        chains = {k : InferenceChain() for k in keys}
+        for k, line, shape in zip(self.key, self.line, self.shapes):
+            if k in chains: chains[k].push((line if line >= 0 else None, shape))
+        return chains
+    
+    def of(self, context : 'Context') -> SymbolTable:
+        keys = [k for k, (owner, _) in enumerate(self.owners) if owner is context]
+        chains = self.read(keys)
+        return SymbolTable({self.owners[k][1] : chains[k] for k in keys})
+    
+    def at(self, line : int) -> InferenceChain | None:
+        '''The chain of a variable inferred on `line`, the last one to be in compact mode; None if there is none.'''
+        if self.compact:
+            for i in range(len(self.key) - 1, -1, -1):
+                if self.line[i] == line: return self.read([self.key[i]])[self.key[i]]
+            return None
+        
+        for chain in self.chains[::-1]:
+            if any(each[0] == line for each in chain.chain): return chain
+        return None
 
 
 class Context:
     def __init__(
-            self, initshapes : dict = None, dims : list[Dimension] = None, sls : list[ShapeLength] = None,
-            program : Program = None, flow : FlowDef = None
+            self, initshapes : dict = None, dims : DimSolver = None, sls : DimSolver = None,
+            program : Program = None, flow : FlowDef = None, instances : dict = None, chains : Chains = None
         ) -> None:
-        self.shapes : dict[Var | Symbol | Arg | str, Shape | Context] = initshapes if initshapes is not None else dict()
-        self.dimensions : list[Dimension] = dims if dims is not None else []
-        self.shapelengths : list[ShapeLength] = sls if sls is not None else []
+        self.shapes : SymbolTable[Var | Symbol | Arg | str, Shape | Context] = SymbolTable(initshapes)
+        self.dimensions : DimSolver = dims if dims is not None else DimSolver(Dimension)
+        self.shapelengths : DimSolver = sls if sls is not None else DimSolver(ShapeLength)
         self.program = program
         self.flow = flow
-        self.ichains = dict()
+        self.instances : dict[tuple, Instance] = instances if instances is not None else dict()
+        self.chains = chains
     
     def __getitem__(self, key : Var | Symbol | Arg) -> Shape:
         return self.shapes[key]
     
     def __setitem__(self, key : Var | Symbol | Arg, value : Any | Shape):
         self.shapes[key] = value
-        if isinstance(key, Var): self.add_inference(key, key.line, value)
+        if (self.chains is not None) and isinstance(key, Var): self.chains.push(self, key, key.line, value)
     
     def __contains__(self, key : Var | Symbol | Arg) -> bool:
-        for each in self.shapes.keys():
-            if each.__hash__() == key.__hash__(): return True
-        return False
+        return key in self.shapes
     
-    def add_inference(self, k : Var, lineno : int, shape : Shape):
-        if k not in self.ichains:
-            self.ichains[k] = InferenceChain()
-        self.ichains[k].push((lineno, shape))
+    @property
+    def ichains(self) -> SymbolTable[Var, InferenceChain]:
+        return self.chains.of(self) if self.chains is not None else SymbolTable()
     
     def define_dimension(self) -> Dimension:
-        newdim = Dimension()
-        self.dimensions.append(newdim)
-        return newdim
+        return self.dimensions.new()
     
     def define_shape_length(self) -> ShapeLength:
-        newsl = ShapeLength()
-        self.shapelengths.append(newsl)
-        return newsl
+        return self.shapelengths.new()
+    
+    def solver(self, unk : Dimension | ShapeLength) -> DimSolver:
+        return self.dimensions if type(unk) == Dimension else self.shapelengths
     
-    def subcontext(self, call : Call, init : object = None) -> object:
+    def unify(self, terminal : Dimension | ShapeLength, value : Any) -> Any:
+        '''Merges the unknown terminal `terminal` with `value`, another terminal; returns what they resolve to.'''
+        if type(value) == type(terminal):
+            return self.solver(terminal).union(terminal, value)
+        self.solver(terminal).bind(terminal, value)
+        return value
+    
+    def subcontext(self, call : Call, init : object, callshapes : list[Shape | None]) -> object:
         caller = call.name
         flowargs = call.flow.proto.symbols
-        callshapes = [flowlengths_expr(x, self) for x in (call.args.vals if type(call.args) == Tuple else call.args)]
         subcont = {
             arg : shape for arg, shape in zip(flowargs, callshapes)
         }
@@ -61,48 +232,338 @@ class Context:
         
         subcont = Context(
             initshapes=subcont, dims=self.dimensions, sls=self.shapelengths, program=self.program,
-            flow=call.flow
+            flow=call.flow, instances=self.instances, chains=self.chains
         )
         
         self.shapes[caller] = subcont
         return subcont
     
-    def seed_shapes(self) -> None:
-        for _, each in enumerate(self.shapelengths):
-            if type(each) != int:
-                raise InferenceError(
-                    f'Cannot seed shapes; found un-inferred shape length {each}!'
-                )
-        for each in (self.shapes):
-            if type(self.shapes[each]) == Context: self.shapes[each].seed_shapes()
-            else:
-                if not self.shapes[each].dims:
-                    self.shapes[each].dims = [self.define_dimension() for _ in range(self.shapes[each].length)]
-            
+    def seed_shapes(self, check : bool = True) -> None:
+        if check:
+            for each in self.shapelengths:
+                each = followdim(each, self)
+                if type(each) != int:
+                    raise InferenceError(
+                        f'Cannot seed shapes; found un-inferred shape length {each}!'
+                    )
+        for context, _, value in self.walk():
+            if (type(value) != Context) and (not value.dims):
+                length = followlen(value.length, context)
+                value.dims = [context.define_dimension() for _ in range(length)]
+    
+    def resolve(self) -> None:
+        for context, _, value in self.walk():
+            if type(value) != Context:
+                value.length = followlen(value.length, context)
+                value.dims = [followdim(x, context) for x in value.dims]
     
     def bake(self) -> None:
-        for each in (self.shapes):
-            if type(self.shapes[each]) == Context: self.shapes[each].bake()
-            else:
-                self.shapes[each].dims = [followdim(x, self) for x in self.shapes[each].dims]
+        '''
+        Resolves every shape of the context tree, then renumbers the unknowns still in it by order of first
+        appearance, into solvers holding only those; the same build always bakes to the same ids, and the
+        unknowns and subflow instances only inference needed are released.
+        '''
+        self.resolve()
+        dims, sls = DimSolver(Dimension), DimSolver(ShapeLength)
+        renamed : dict[tuple[type, int], Dimension | ShapeLength] = dict()
+        
+        def rename(x : Any) -> Any:
+            if not unknown(x): return x
+            if (type(x), x.id) not in renamed: renamed[type(x), x.id] = (dims if type(x) == Dimension else sls).new()
+            return renamed[type(x), x.id]
+        
+        # in the order `getdict` lists them; subflows can share `Shape` objects, which are only renamed once
+        self.dimensions, self.shapelengths = dims, sls
+        seen = set()
+        for _, _, each in self.walk():
+            if type(each) == Context: each.dimensions, each.shapelengths = dims, sls
+            elif id(each) not in seen:
+                seen.add(id(each))
+                each.length = rename(each.length)
+                each.dims = [rename(x) for x in each.dims]
+        
+        self.instances.clear()
+    
     
     
+    def walk(self) -> Iterator[tuple['Context', Var | str, 'Shape | Context']]:
+        '''Every entry of the context tree, with the context holding it, depth first and in order.'''
+        # on a stack of our own: contexts nest as deep as subflows do
+        pending = [(self, iter(self.shapes.items()))]
+        while pending:
+            context, items = pending[-1]
+            entry = next(items, None)
+            if entry is None:
+                pending.pop()
+                continue
+            
+            yield context, entry[0], entry[1]
+            if type(entry[1]) == Context: pending.append((entry[1], iter(entry[1].shapes.items())))
     
     def __repr__(self) -> str:
         return self.__str__()
     
     def getdict(self) -> dict:
-        rep = {
-            str(a) : (str(self.shapes[a]) if type(self.shapes[a]) != Context else self.shapes[a].getdict()) for a in self.shapes
-        }
+        rep = dict()
+        dicts = {id(self) : rep}
+        for context, var, value in self.walk():
+            if type(value) == Context: dicts[id(value)] = dicts[id(context)][str(var)] = dict()
+            else: dicts[id(context)][str(var)] = str(value)
         return rep
     
     def __str__(self) -> str:
+        # `json.dumps(self.getdict(), indent = '    ')`, which recurses once per level of the tree
+        tree = self.getdict()
+        out, pending, first = ['{' if tree else '{}'], [iter(tree.items())] if tree else [], True
+        while pending:
+            entry = next(pending[-1], None)
+            if entry is None:
+                pending.pop()
+                out.append('\n' + '    ' * len(pending) + '}')
+                first = False
+                continue
+            
+            out.append((',\n' if not first else '\n') + '    ' * len(pending) + json.dumps(entry[0]) + ': ')
+            first = False
+            if (type(entry[1]) == dict) and entry[1]:
+                out.append('{')
+                pending.append(iter(entry[1].items()))
+                first = True
+            else: out.append(json.dumps(entry[1]))
+        
         return (
             f'ShapeLengths  : {self.shapelengths}\n' +
             f'Dimensions    : {self.dimensions}\n' +
-            json.dumps(self.getdict(), indent = '    ')
+            ''.join(out)
+        )
+
+
+
+class Snapshot:
+    '''
+    Canonical picture of a context tree. Unknowns are renamed by order of first appearance
+    and `Shape` objects are numbered, so two instantiations of a subflow that differ only in
+    the identity of their unknowns get the same `key`.
+    '''
+    def __init__(self, context : Context) -> None:
+        self.context = context
+        self.unknowns : list[Dimension | ShapeLength] = []
+        self.uindex : dict[tuple, int] = dict()
+        self.shapes : list[Shape] = []
+        self.sindex : dict[int, int] = dict()
+        self.key = self.walk(context, self.signature)
+    
+    def canon(self, x : Any) -> Any:
+        x = followdim(x, self.context)
+        if not unknown(x): return x
+        k = (type(x) == Dimension, x.id)
+        if k not in self.uindex:
+            self.uindex[k] = len(self.unknowns)
+            self.unknowns.append(x)
+        return ('?', k[0], self.uindex[k])
+    
+    def ref(self, shape : Shape) -> int:
+        if id(shape) not in self.sindex:
+            self.sindex[id(shape)] = len(self.shapes)
+            self.shapes.append(shape)
+        return self.sindex[id(shape)]
+    
+    def entry(self, shape : Shape) -> tuple:
+        return (
+            self.ref(shape), self.canon(shape.length),
+            tuple(self.canon(x) for x in shape.dims) if shape.dims is not None else None
         )
+    
+    def signature(self, var : Var | str, value : Shape | Context, sub : tuple) -> tuple:
+        # by name, which hashes faster than the `Var` and means the same
+        if sub is not None: return (symkey(var), id(value.flow), sub)
+        return (symkey(var),) + self.entry(value)
+    
+    def layout(self, var : Var | str, value : Shape | Context, sub : tuple) -> tuple:
+        if sub is not None: return (var, value.flow, sub)
+        return (var,) + self.entry(value) + (value.line,)
+    
+    def walk(self, context : Context, visit : Callable) -> tuple:
+        # `visit` of each entry in order, a subcontext's after all of its own entries'; on a stack of our own
+        pending = [(iter(context.shapes.items()), [], None)]
+        while True:
+            items, done, parent = pending[-1]
+            for var, value in items:
+                if type(value) == Context:
+                    pending.append((iter(value.shapes.items()), [], (var, value)))
+                    break
+                done.append(visit(var, value, None))
+            else:
+                pending.pop()
+                if parent is None: return tuple(done)
+                pending[-1][1].append(visit(*parent, tuple(done)))
+
+
+class Instance:
+    '''
+    Solved instantiation of a subflow, recorded against the `Snapshot` taken before inference ran.
+    `bindings` holds what every unknown of the snapshot resolved to, `layout` the resulting context tree.
+    '''
+    def __init__(self, pre : Snapshot, result : Shape | None) -> None:
+        self.bindings = [pre.canon(x) for x in list(pre.unknowns)]
+        self.layout = pre.walk(pre.context, pre.layout)
+        self.result = (pre.entry(result) + (result.line,)) if result is not None else None
+    
+    def apply(self, pre : Snapshot) -> Shape | None:
+        context = pre.context
+        fresh, made = dict(), dict()
+        
+        def subst(x : Any) -> Any:
+            if type(x) != tuple: return x
+            _, isdim, k = x
+            if k < len(pre.unknowns): return pre.unknowns[k]
+            if k not in fresh:
+                fresh[k] = context.define_dimension() if isdim else context.define_shape_length()
+            return fresh[k]
+        
+        def shape(ref : int, length : Any, dims : tuple | None, line : int) -> Shape:
+            if ref < len(pre.shapes): obj = pre.shapes[ref]
+            elif ref in made: return made[ref]
+            else: obj = made[ref] = Shape()
+            obj.length = subst(length)
+            obj.dims = [subst(x) for x in dims] if dims is not None else None
+            obj.line = line
+            return obj
+        
+        def build(target : Context, layout : tuple) -> None:
+            pending = [(target, iter(layout))]
+            while pending:
+                target, entries = pending[-1]
+                entry = next(entries, None)
+                if entry is None:
+                    pending.pop()
+                    continue
+                
+                var, *rest = entry
+                if len(rest) == 2:
+                    sub = target.shapes.get(var)
+                    if type(sub) != Context:
+                        sub = Context(
+                            dims=context.dimensions, sls=context.shapelengths, program=context.program,
+                            instances=context.instances, chains=context.chains
+                        )
+                        target.shapes[var] = sub
+                    sub.flow = rest[0]
+                    pending.append((sub, iter(rest[1])))
+                else: target.shapes[var] = shape(*rest)
+        
+        for k, x in enumerate(self.bindings):
+            if (type(x) == tuple) and (x[2] >= len(pre.unknowns)) and (x[2] not in fresh):
+                fresh[x[2]] = pre.unknowns[k]
+                continue
+            a, b = followdim(pre.unknowns[k], context), followdim(subst(x), context)
+            if a == b: continue
+            if unknown(a): context.unify(a, b)
+            else: context.unify(b, a)
+        
+        build(context, self.layout)
+        return shape(*self.result) if self.result is not None else None
+
+
+def calls(expr : Any) -> Iterator[Call]:
+    '''Every subflow `Call` in the expression `expr`, outermost first.'''
+    pending = [expr]
+    while pending:
+        node = pending.pop()
+        if type(node) == Op:
+            # the right of a `.` is an attribute, never a subflow
+            if node.value != '.': pending.append(node.right)
+            pending.append(node.left)
+        elif type(node) == Call:
+            yield node
+            pending.extend(reversed(node.args.vals if type(node.args) == Tuple else node.args))
+
+
+def instantiations(program : Program, root : FlowDef) -> dict[str, int]:
+    '''
+    Upper bound on how many times one run of shape inference from `root` instantiates each flow it
+    reaches, by name: the bounds of its callers, summed over its call sites, and 1 for `root`. Flows
+    on a cycle of calls are bounded by 2, for "more than once".
+    '''
+    sites : dict[str, list[str]] = dict()
+    waiting, pending = {root.name : 0}, [root]
+    while pending:
+        flow = pending.pop()
+        sites[flow.name] = []
+        lets = {
+            symkey(x) : program.getflow(stmt.flow) for stmt in flow.body.statements if type(stmt) == Let for x in stmt.idts
+        }
+        for stmt in flow.body.statements:
+            if type(stmt) == Assignment: expr = stmt.right
+            elif type(stmt) == Return: expr = stmt.value
+            else: continue
+            
+            for call in calls(expr):
+                callee = lets.get(symkey(call.name))
+                if callee is None: continue
+                if callee.name not in waiting:
+                    waiting[callee.name] = 0
+                    pending.append(callee)
+                sites[flow.name].append(callee.name)
+                waiting[callee.name] += 1
+    
+    # callers before callees, each adding its bound to every flow it calls
+    uses = dict.fromkeys(sites, 0)
+    ready = [x for x in sites if not waiting[x]]
+    while ready:
+        name = ready.pop()
+        uses[name] = max(1, uses[name])
+        for callee in sites[name]:
+            uses[callee] += uses[name]
+            waiting[callee] -= 1
+            if not waiting[callee]: ready.append(callee)
+    
+    return {x : (uses[x] if not waiting[x] else 2) for x in sites}
+
+
+def run(infer : Callable, flow : FlowDef, context : Context) -> Shape | None:
+    '''
+    Runs `infer` (`flowlengths_flow` or `flowshape_flow`) for `flow` over `context`, along with every
+    subflow instantiation it yields as `(infer, flow, context)`, sending each one's result back; returns
+    its result. An instantiation is replayed instead when a previous one was solved from the same
+    canonical state, for flows instantiated more than once per run.
+    '''
+    program = context.program
+    if program.uses is None: program.uses = dict()
+    if flow.name not in program.uses: program.uses[flow.name] = instantiations(program, flow)
+    uses = program.uses[flow.name]
+    
+    # on a stack of our own: subflows nest as deep as programs do
+    stack = [(infer(flow, context), None, None)]
+    value, failed = None, None
+    while True:
+        current, key, pre = stack[-1]
+        try: request = current.throw(failed) if failed is not None else current.send(value)
+        except StopIteration as done:
+            stack.pop()
+            value, failed = done.value, None
+            if key is not None: pre.context.instances[key] = Instance(pre, value)
+            if not stack: return value
+            continue
+        except Exception as e:
+            stack.pop()
+            if not stack: raise
+            value, failed = None, e
+            continue
+        
+        infer, flow, context = request
+        value = None
+        # a snapshot costs as much as the subtree it pictures: only worth it if it can be replayed
+        if uses.get(flow.name, 2) < 2:
+            stack.append((infer(flow, context), None, None))
+            continue
+        
+        pre = Snapshot(context)
+        key = (infer.__name__, id(flow), pre.key)
+        if key not in context.instances: stack.append((infer(flow, context), key, pre))
+        else:
+            try: value = context.instances[key].apply(pre)
+            except Exception as e: failed = e
 
 
 
@@ -127,14 +588,15 @@ def process_ss_body(body : Body, context : Context) -> None:
     for stmt in body.statements:
         if type(stmt.shape) == Tuple:
             if len(stmt.shape.vals) == 1: stmt.shape.vals.append(1)
-            shape = Shape(dims=stmt.shape.vals)
+            # a copy: the build is shaped again for inference chains, and its `_`s must stay unknown
+            shape = Shape(dims=list(stmt.shape.vals))
             shape.length = len(shape.dims)
             
             for i, each in enumerate(shape.dims):
                 if each == "_":
                     shape.dims[i] = context.define_dimension()
             
-            if stmt.var != 'output':
+            if (stmt.var != 'output') and (type(stmt.var) == str):
                 if (context.flow.proto.symbols is not None) and stmt.var in context.flow.proto.symbols:
                     stmt.var = Symbol(line = stmt.line, name = stmt.var)
                 elif (context.flow.proto.args is not None) and stmt.var in context.flow.proto.args:
@@ -144,13 +606,13 @@ def process_ss_body(body : Body, context : Context) -> None:
         else:
             sc = Context(
                 program = context.program, flow = stmt.flow, dims=context.dimensions,
-                sls=context.shapelengths
+                sls=context.shapelengths, instances=context.instances, chains=context.chains
             )
             context[stmt.var] = sc
             process_ss_body(stmt.shape, sc)
 
-def contextfrombuild(build : Build, program : Program) -> Context:
-    context = Context(program = program, flow = build.flow)
+def contextfrombuild(build : Build, program : Program, chains : Chains = None) -> Context:
+    context = Context(program = program, flow = build.flow, chains = chains)
     process_ss_body(build.body, context)
     return context
 
@@ -212,22 +674,15 @@ attrs = {
 
 
 def followdim(dim : Dimension | ShapeLength, context : Context) -> Dimension | ShapeLength | int:
-    if type(dim) not in [Dimension, ShapeLength]: return dim
-    while True:
-        dim = context.dimensions[dim.id] if type(dim) == Dimension else context.shapelengths[dim.id]
-        if type(dim) == Dimension:
-            if context.dimensions[dim.id] == dim: return dim
-        elif type(dim) == ShapeLength:
-            if context.shapelengths[dim.id] == dim: return dim
-        else: return dim
+    while unknown(dim):
+        terminal = context.solver(dim).resolve(dim)
+        if type(terminal) == type(dim): return terminal
+        dim = terminal
+    return dim
 
 def followlen(sl : ShapeLength, context : Context) -> ShapeLength | int:
     if type(sl) != ShapeLength: return sl
-    while True:
-        sl = context.shapelengths[sl.id]
-        if type(sl) == ShapeLength:
-            if context.shapelengths[sl.id] == sl: return sl
-        else: return sl
+    return followdim(sl, context)
 
 
 
@@ -239,7 +694,7 @@ def consolidatelength(a : Shape | None, b : Shape | None, context : Context) ->
     elif a is None: return Shape(length=b.length)
     elif b is None: return Shape(length=a.length)
     
-    elif a == b: return Shape(length=a)
+    elif a == b: return Shape(length=a.length)
     
     # else:
     al, bl = followlen(a.length, context), followlen(b.length, context)
@@ -252,11 +707,11 @@ def consolidatelength(a : Shape | None, b : Shape | None, context : Context) ->
             line=line, charpos=charpos
         )
     elif type(al) == ShapeLength:
-        context.shapelengths[al.id] = bl
+        context.unify(al, bl)
         a.length = bl
         # outlength = bl
     elif type(bl) == ShapeLength:
-        context.shapelengths[bl.id] = al
+        context.unify(bl, al)
         b.length = al
         # outlength = al
     
@@ -264,7 +719,7 @@ def consolidatelength(a : Shape | None, b : Shape | None, context : Context) ->
     return a
 
 
-def flowlengths_flow(flow : FlowDef, context : Context) -> Shape:
+def flowlengths_flow(flow : FlowDef, context : Context) -> Generator[tuple, Shape | None, Shape | None]:
     if flow.subftable is None:
         flow.subftable = dict()
     
@@ -276,20 +731,17 @@ def flowlengths_flow(flow : FlowDef, context : Context) -> Shape:
         
         if type(stmt) == Assignment:
             left, right = stmt.left, stmt.right
-            context[left] = flowlengths_expr(right, context)
+            context[left] = yield from flowlengths_expr(right, context)
         
         elif type(stmt) == Let:
-            flowdef = stmt.flow
-            for every in context.program.flows[::-1]:
-                if every.name == flowdef:
-                    flowdef = every
-                    break
+            flowdef = context.program.getflow(stmt.flow)
+            if flowdef is None: flowdef = stmt.flow
             for var in stmt.idts:
                 subftable[var.name] = flowdef
         
         elif type(stmt) == Return:
             flow.retstmt = stmt
-            outlength = flowlengths_expr(stmt.value, context)
+            outlength = yield from flowlengths_expr(stmt.value, context)
             if 'output' in context:
                 context['output'].length = consolidatelength(outlength, context['output'], context).length
             else:
@@ -298,26 +750,54 @@ def flowlengths_flow(flow : FlowDef, context : Context) -> Shape:
     
     return outlength
 
-def flowlengths_expr(node : Expr | Var | Number | str, context : Context) -> Shape | None:    
-    if type(node) in [Number, int, float]: return None
-    if isinstance(node, Var) or (type(node) == str):
-        ret = None
-        if node in context: ret = context[node]
-        else:
-            context[node] = Shape(length=context.define_shape_length())
-            ret = context[node]
-        return ret
-    
-    if type(node) == Op:
+def link_calls(flow : FlowDef, program : Program) -> None:
+    '''
+    Leaves on `flow`, and every subflow it calls, the annotations `flowlengths_flow` would (`retstmt`,
+    named `subftable` entries, `Call.flow`); for contexts restored from a cache instead of inferred.
+    '''
+    seen, pending = set(), [flow]
+    while pending:
+        flow = pending.pop()
+        if id(flow) in seen: continue
+        seen.add(id(flow))
         
-        if node.value == '.':
-            if type(node.right) not in [Call, Var, str, Symbol, Arg]:
-                raise UnknownAttribute(
-                    f'Unknown attribute; got {node.right}!',
-                    line=node.right.line, charpos=node.right.charpos
-                )
+        if flow.subftable is None: flow.subftable = dict()
+        for stmt in flow.body.statements:
+            if type(stmt) == Assignment: expr = stmt.right
+            elif type(stmt) == Let:
+                for var in stmt.idts: flow.subftable[var.name] = program.getflow(stmt.flow)
+                continue
+            elif type(stmt) == Return:
+                flow.retstmt = stmt
+                expr = stmt.value
+            else: continue
             
-            left = flowlengths_expr(node.left, context)
+            for call in calls(expr):
+                call.flow = flow.subftable[call.name]
+                pending.append(call.flow)
+
+def flowlengths_expr(node : Expr | Var | Number | str, context : Context) -> Generator[tuple, Shape | None, Shape | None]:
+    # on stacks of our own: `a + b + c + ...` parses into a tree as deep as the sum is long
+    values, pending = [], [(node, None)]
+    while pending:
+        node, visited = pending.pop()
+        
+        if type(node) in [Number, int, float]: values.append(None)
+        elif isinstance(node, Var) or (type(node) == str):
+            if node not in context: context[node] = Shape(length=context.define_shape_length())
+            values.append(context[node])
+        
+        elif (type(node) == Op) and (node.value == '.'):
+            if visited is None:
+                if type(node.right) not in [Call, Var, str, Symbol, Arg]:
+                    raise UnknownAttribute(
+                        f'Unknown attribute; got {node.right}!',
+                        line=node.right.line, charpos=node.right.charpos
+                    )
+                pending += [(node, True), (node.left, None)]
+                continue
+            
+            left = values.pop()
             args = []
             name = node.right
             
@@ -331,14 +811,15 @@ def flowlengths_expr(node : Expr | Var | Number | str, context : Context) -> Sha
                     line=node.right.line, charpos=node.right.charpos
                 )
             
-            return attrs[name]['length'](left, args, context)
-        
+            values.append(attrs[name]['length'](left, args, context))
         
-        else:
-            left, right = flowlengths_expr(node.left, context), flowlengths_expr(node.right, context)
-            length = consolidatelength(left, right, context)
-            
+        elif type(node) == Op:
+            if visited is None:
+                pending += [(node, True), (node.right, None), (node.left, None)]
+                continue
             
+            right, left = values.pop(), values.pop()
+            length = consolidatelength(left, right, context)
             
             if isinstance(node.left, Var) or (type(node.left) == str):
                 if (node.left not in context) or (context[node.left] is None):
@@ -347,14 +828,27 @@ def flowlengths_expr(node : Expr | Var | Number | str, context : Context) -> Sha
                 if (node.right not in context) or (context[node.right] is None):
                     context[node.right] = Shape(length = length.length)
             
-            return Shape(length = length.length)
-    
-    if type(node) == Call:
-        node.flow = context.flow.subftable[node.name]
+            values.append(Shape(length = length.length))
+        
+        elif type(node) == Call:
+            if visited is None:
+                node.flow = context.flow.subftable[node.name]
+                args = node.args.vals if type(node.args) == Tuple else node.args
+                # what the context held under the call's name before its arguments were inferred
+                pending.append((node, (context[node.name] if node.name in context else None, len(args))))
+                pending.extend((x, None) for x in reversed(args))
+                continue
+            
+            init, n = visited
+            callshapes = values[len(values) - n:]
+            del values[len(values) - n:]
+            
+            sub = context.subcontext(node, init, callshapes)
+            values.append((yield (flowlengths_flow, node.flow, sub)))
         
-        sub = context.subcontext(node, context[node.name] if node.name in context else None)
-        length = flowlengths_flow(node.flow, sub)
-        return length
+        else: values.append(None)
+    
+    return values.pop()
 
 
 
@@ -400,20 +894,14 @@ def consolidate(a : Shape, b : Shape, context : Context) -> Shape:
                         f'`{ai}` ~> `{terminala}` and `{bi}` ~> `{terminalb}`!',
                         line = line, charpos=charpos
                     )
-                elif unknown(terminala) and unknown(terminalb):
-                    context.dimensions[terminala.id] = terminalb
-                    newshape.append(terminalb)
                 elif unknown(terminala):
-                    context.dimensions[terminala.id] = terminalb
-                    newshape.append(terminalb)
+                    newshape.append(context.unify(terminala, terminalb))
                 else:
-                    context.dimensions[terminalb.id] = terminala
-                    newshape.append(terminala)
+                    newshape.append(context.unify(terminalb, terminala))
             elif unknown(ai):
                 terminal = followdim(ai, context)
                 if unknown((terminal)):
-                    context.dimensions[terminal.id] = bi
-                    newshape.append(bi)
+                    newshape.append(context.unify(terminal, bi))
                 elif terminal == bi:
                     newshape.append(bi)
                 else:
@@ -427,8 +915,7 @@ def consolidate(a : Shape, b : Shape, context : Context) -> Shape:
             elif unknown(bi):
                 terminal = followdim(bi, context)
                 if type(terminal) == Dimension:
-                    context.dimensions[terminal.id] = ai
-                    newshape.append(ai)
+                    newshape.append(context.unify(terminal, ai))
                 elif terminal == ai:
                     newshape.append(ai)
                 else:
@@ -450,110 +937,129 @@ def consolidate(a : Shape, b : Shape, context : Context) -> Shape:
     return Shape(dims=newshape)
 
 
-def flowshape_expr(node : Expr | Var | Number, context : Context) -> Shape | None:
-    if type(node) in [Number, int, float]: return None
-    if isinstance(node, Var) or (type(node) == str):
-        if node in context: return context[node]
-        else: return None
-    
-    if type(node) == Op:
-        if node.value in ['+', '-', '*', '/', '^']:
-            
-            left = flowshape_expr(node.left, context)
-            right = flowshape_expr(node.right, context)
-            try : shape = consolidate(left, right, context)
-            except Exception as e:
-                e.args = (
-                    (f"Shape consolidation failed between `{left}` and `{right}`!\n")+
-                    e.args[0],
-                )
-                e.line = node.line
-                e.charpos = node.charpos
-                raise e
-            
-            return shape
+def flowshape_expr(node : Expr | Var | Number, context : Context) -> Generator[tuple, Shape | None, Shape | None]:
+    # on stacks of our own, as `flowlengths_expr`
+    values, pending = [], [(node, None)]
+    while pending:
+        node, visited = pending.pop()
         
-        elif node.value == '@':
-            
-            left, right = flowshape_expr(node.left, context), flowshape_expr(node.right, context)
+        if type(node) in [Number, int, float]: values.append(None)
+        elif isinstance(node, Var) or (type(node) == str):
+            values.append(context[node] if node in context else None)
+        
+        elif type(node) == Op:
+            if visited is None:
+                if node.value not in ['+', '-', '*', '/', '^', '@', '.']:
+                    values.append(None)
+                    continue
+                
+                if node.value == '.':
+                    if type(node.right) not in [Call, Var, str, Symbol, Arg]:
+                        raise UnknownAttribute(
+                            f'Unknown attribute; got {node.right}!',
+                            line=node.right.line, charpos=node.right.charpos
+                        )
+                    pending += [(node, True), (node.left, None)]
+                else: pending += [(node, True), (node.right, None), (node.left, None)]
+                continue
             
-            bl, br = left.dims[:-2], right.dims[:-2]
-            try : batch = consolidate(Shape(dims=bl), Shape(dims=br), context)
-            except Exception as e:
-                e.args = (
-                    (f"Shape consolidation failed for batch dimensions b/w `{left}` and `{right}`!\n")+
-                    e.args[0],
-                )
-                e.line = node.line
-                e.charpos = node.charpos
-                raise e
+            if node.value in ['+', '-', '*', '/', '^']:
+                right, left = values.pop(), values.pop()
+                try : shape = consolidate(left, right, context)
+                except Exception as e:
+                    e.args = (
+                        (f"Shape consolidation failed between `{left}` and `{right}`!\n")+
+                        e.args[0],
+                    )
+                    e.line = node.line
+                    e.charpos = node.charpos
+                    raise e
+                
+                values.append(shape)
             
-            li, ri = Shape(length=1, dims=[left.dims[-1]]), Shape(length=1, dims=[right.dims[-2]])
-            # dblog(li, ri)
-            try : consolidate(li, ri, context)
-            except Exception as e:
-                e.args = (
-                    (f"Inner dimensions don't match for matrix multiplication b/w `{left}` and `{right}`!\n")+
-                    e.args[0],
-                )
-                e.line = node.line
-                e.charpos = node.charpos
-                raise e
+            elif node.value == '@':
+                right, left = values.pop(), values.pop()
+                
+                bl, br = left.dims[:-2], right.dims[:-2]
+                try : batch = consolidate(Shape(dims=bl), Shape(dims=br), context)
+                except Exception as e:
+                    e.args = (
+                        (f"Shape consolidation failed for batch dimensions b/w `{left}` and `{right}`!\n")+
+                        e.args[0],
+                    )
+                    e.line = node.line
+                    e.charpos = node.charpos
+                    raise e
+                
+                li, ri = Shape(length=1, dims=[left.dims[-1]]), Shape(length=1, dims=[right.dims[-2]])
+                # dblog(li, ri)
+                try : consolidate(li, ri, context)
+                except Exception as e:
+                    e.args = (
+                        (f"Inner dimensions don't match for matrix multiplication b/w `{left}` and `{right}`!\n")+
+                        e.args[0],
+                    )
+                    e.line = node.line
+                    e.charpos = node.charpos
+                    raise e
+                
+                values.append(Shape(dims= batch.dims + [left.dims[-2], right.dims[-1]]))
             
-            shape = Shape(dims= batch.dims + [left.dims[-2], right.dims[-1]])
-            return shape
+            else:
+                left = values.pop()
+                args = []
+                name = node.right
+                
+                if type(node.right) == Call:
+                    args = node.right.args
+                    name = node.right.name
+                
+                if name not in attrs:
+                    raise UnknownAttribute(
+                        f'Unknown attribute; got {node.right}!',
+                        line=node.right.line, charpos=node.right.charpos
+                    )
+                
+                values.append(attrs[name]['shape'](left, args, context))
         
-        elif node.value == '.':
-            if type(node.right) not in [Call, Var, str, Symbol, Arg]:
-                raise UnknownAttribute(
-                    f'Unknown attribute; got {node.right}!',
-                    line=node.right.line, charpos=node.right.charpos
-                )
+        elif type(node) == Call:
+            if visited is None:
+                args = node.args.vals if type(node.args) == Tuple else node.args
+                pending.append((node, (context[node.name], len(args))))
+                pending.extend((x, None) for x in reversed(args))
+                continue
             
-            left = flowshape_expr(node.left, context)
-            args = []
-            name = node.right
+            subcont, n = visited
+            subflow = node.flow
+            callshapes = values[len(values) - n:]
+            del values[len(values) - n:]
             
-            if type(node.right) == Call:
-                args = node.right.args
-                name = node.right.name
-            
-            if name not in attrs:
-                raise UnknownAttribute(
-                    f'Unknown attribute; got {node.right}!',
-                    line=node.right.line, charpos=node.right.charpos
-                )
+            for each, shape in zip(subflow.proto.symbols, callshapes):
+                try : subcont[each] = consolidate(subcont[each], shape, subcont)
+                except Exception as e:
+                    e.args = (
+                        (f"Shape consolidation failed given and inferred; `{subcont[each]}` and `{shape}`!\n")+
+                        e.args[0],
+                    )
+                    e.line = node.line
+                    e.charpos = node.charpos
+                    raise e
             
-            return attrs[name]['shape'](left, args, context)
-    
-    elif type(node) == Call:
-        subcont = context[node.name]
-        subflow = node.flow
-        callshapes = [flowshape_expr(x, context) for x in (node.args.vals if type(node.args) == Tuple else node.args)]
-        
-        for each, shape in zip(subflow.proto.symbols, callshapes):
-            try : subcont[each] = consolidate(subcont[each], shape, subcont)
-            except Exception as e:
-                e.args = (
-                    (f"Shape consolidation failed given and inferred; `{subcont[each]}` and `{shape}`!\n")+
-                    e.args[0],
-                )
-                e.line = node.line
-                e.charpos = node.charpos
-                raise e
+            values.append((yield (flowshape_flow, subflow, subcont)))
         
-        finalshape = flowshape_flow(subflow, subcont)
-        return finalshape
+        else: values.append(None)
+    
+    return values.pop()
 
-def flowshape_flow(flow : FlowDef, context : Context) -> Shape | None:
+def flowshape_flow(flow : FlowDef, context : Context) -> Generator[tuple, Shape | None, Shape | None]:
     outshape = None
     
     for stmt in flow.body.statements:
         if type(stmt) == Assignment:
-            shape = flowshape_expr(stmt.right, context)
+            shape = yield from flowshape_expr(stmt.right, context)
             context[stmt.left] = Shape(length=shape.length, dims=shape.dims, line=shape.line)
         elif type(stmt) == Return:
-            shape = flowshape_expr(stmt.value, context)
+            shape = yield from flowshape_expr(stmt.value, context)
             try : context['output'] = consolidate(context['output'], shape, context)
             except Exception as e:
                 e.args = (
@@ -605,37 +1111,71 @@ def isvalididt(x : str) -> bool:
 
 
 def varandnums(root : Expr, flow : FlowDef, lineno : int = None) -> Var | Number:
-    if type(root) == Op:
-        if root.left:
-            root.left = varandnums(root.left, flow)
-        if root.right:
-            root.right = varandnums(root.right, flow)
-        return root
-    elif type(root) == Tuple:
-        root.vals = list(map(lambda x: varandnums(x, flow), root.vals))
-        return root
-    elif type(root) == Call:
-        root.name = varandnums(root.name, flow)
-        root.args = list(map(lambda x:varandnums(x, flow), varandnums(root.args, flow)))
-        return root
-    elif integer(root) or isint(root):
-        return int(root)
-    elif (type(root) == float) or isfloat(root):
-        return float(root)
-    elif (type(root) == str):
-        if flow is not None:
-            if (flow.proto.symbols is not None) and (root in flow.proto.symbols): return Symbol(name = root)
-            elif (flow.proto.args is not None) and (root in flow.proto.args): return Arg(name = root)
-            else: return Var(name = root)
-        else: return root
-    elif type(root) == Term:
-        val = varandnums(root.value, flow)
-        if isinstance(val, Node):
-            val.line = root.line
-            val.charpos = root.charpos
-        return val
-    else:
-        return root
+    def leaf(root : Any) -> Any:
+        if integer(root) or isint(root):
+            return int(root)
+        elif (type(root) == float) or isfloat(root):
+            return float(root)
+        elif (type(root) == str):
+            if flow is not None:
+                if (flow.proto.symbols is not None) and (root in flow.proto.symbols): return Symbol(name = root)
+                elif (flow.proto.args is not None) and (root in flow.proto.args): return Arg(name = root)
+                else: return Var(name = root)
+            else: return root
+        else:
+            return root
+    
+    # children before parents, on stacks of our own: a long sum parses into a tree as deep as it is long
+    done, pending = [], [(root, False)]
+    while pending:
+        root, visited = pending.pop()
+        
+        if type(root) == Op:
+            if not visited:
+                pending.append((root, True))
+                if root.right: pending.append((root.right, False))
+                if root.left: pending.append((root.left, False))
+                continue
+            if root.right: root.right = done.pop()
+            if root.left: root.left = done.pop()
+            root.touch()
+            done.append(root)
+        
+        elif type(root) == Tuple:
+            if not visited:
+                pending.append((root, True))
+                pending.extend((x, False) for x in reversed(root.vals))
+                continue
+            root.vals = done[len(done) - len(root.vals):]
+            del done[len(done) - len(root.vals):]
+            root.touch()
+            done.append(root)
+        
+        elif type(root) == Call:
+            args = root.args.vals if type(root.args) == Tuple else root.args
+            if not visited:
+                pending.append((root, True))
+                pending.extend((x, False) for x in reversed(args))
+                pending.append((root.name, False))
+                continue
+            root.args = done[len(done) - len(args):]
+            del done[len(done) - len(args):]
+            root.name = done.pop()
+            root.touch()
+            done.append(root)
+        
+        elif type(root) == Term:
+            if not visited:
+                pending += [(root, True), (root.value, False)]
+                continue
+            val = done[-1]
+            if isinstance(val, Node):
+                val.line = root.line
+                val.charpos = root.charpos
+        
+        else: done.append(leaf(root))
+    
+    return done.pop()
 
 def iron_bb(body : Body):
     for s in body.statements:
@@ -681,6 +1221,9 @@ def iron(root : Program) -> Program:
                 stmt.right = varandnums(stmt.right, each)
         # print(each)
     
+    # flow names were Terms until now
+    root.flowindex = None
+    
     builds : list[Build] = root.builds
     for each in builds:
         each.name = each.name.value
@@ -691,45 +1234,86 @@ def iron(root : Program) -> Program:
 
 
 
-def semantic_check_expr(expr : Expr, scope : list, subfs : dict[str | Var, FlowDef], program : Program):
-    if type(expr) in [str, Var, Symbol, Arg]:
-        if expr not in scope:
-            raise UnknownVar(
-                f'Unknown identifier; `{expr}`!', line=expr.line, charpos=expr.charpos
-            )
-    elif type(expr) in [int, float, Number]: pass
-    elif type(expr) == Op:
-        if expr.value == '.':
-            if type(expr.right) not in [Call, str, Var, Symbol, Arg]:
-                raise InvalidAttribute(
-                    f'Invalid attribute; got `{expr.right}`!', line=expr.right.line, charpos=expr.right.charpos
+def semantic_check_expr(expr : Expr, scope : list, subfs : dict[str | Var, FlowDef], program : Program) -> Iterator[FlowDef]:
+    '''Checks `expr`, yielding every subflow it calls for `semantic_check_flow` to check, after the call's arguments.'''
+    # on a stack of our own: a long sum parses into a tree as deep as it is long
+    pending = [expr]
+    while pending:
+        expr = pending.pop()
+        
+        if type(expr) == FlowDef: yield expr
+        elif type(expr) in [str, Var, Symbol, Arg]:
+            if expr not in scope:
+                raise UnknownVar(
+                    f'Unknown identifier; `{expr}`!', line=expr.line, charpos=expr.charpos
                 )
+        elif type(expr) in [int, float, Number]: pass
+        elif type(expr) == Op:
+            if expr.value == '.':
+                if type(expr.right) not in [Call, str, Var, Symbol, Arg]:
+                    raise InvalidAttribute(
+                        f'Invalid attribute; got `{expr.right}`!', line=expr.right.line, charpos=expr.right.charpos
+                    )
+                
+                name = expr.right.name if type(expr.right) in [Symbol, Var, Arg, Call] else expr.right
+                if name not in attrs:
+                    raise UnknownAttribute(
+                        f'Unknown attribute `{name}`!', line=expr.right.line, charpos=expr.right.charpos
+                    )
+                
+                pending.append(expr.left)
             
-            name = expr.right.name if type(expr.right) in [Symbol, Var, Arg, Call] else expr.right
-            if name not in attrs:
-                raise UnknownAttribute(
-                    f'Unknown attribute `{name}`!', line=expr.right.line, charpos=expr.right.charpos
+            else: pending += [expr.right, expr.left]
+        elif type(expr) == Call:
+            if expr.name not in subfs:
+                raise UnknownSubFlow(
+                    f'Unknown subflow; got `{expr.name}`!',
+                    line=expr.line, charpos=expr.charpos
                 )
-            
-            semantic_check_expr(expr.left, scope, subfs, program)
-            
-        else:
-            semantic_check_expr(expr.left, scope, subfs, program)
-            semantic_check_expr(expr.right, scope, subfs, program)
-    elif type(expr) == Call:
-        if expr.name not in subfs:
-            raise UnknownSubFlow(
-                f'Unknown subflow; got `{expr.name}`!',
-                line=expr.line, charpos=expr.charpos
-            )
-        args = expr.args.vals if type(expr.args) == Tuple else expr.args
-        for each in args:
-            semantic_check_expr(each, scope, subfs, program)
-        semantic_check_flow(subfs[expr.name], program)
+            # the flow itself marks where its arguments end
+            pending.append(subfs[expr.name])
+            pending.extend(reversed(expr.args.vals if type(expr.args) == Tuple else expr.args))
 
 
 
 def semantic_check_flow(flow : FlowDef, program : Program, callback : Callable = None) -> None:
+    # every flow is checked once per program; later uses as a subflow reuse the result
+    if program.checked is None: program.checked = dict()
+    
+    # subflows are checked where they are called, on a stack of our own: they nest as deep as programs do
+    pending, failed = [], None
+    while True:
+        if flow is not None:
+            if id(flow) in program.checked: failed = program.checked[id(flow)]
+            else:
+                program.checked[id(flow)] = None
+                pending.append((flow, semantic_check_flowbody(flow, program, callback if not pending else None)))
+        if not pending:
+            if failed is not None: raise failed
+            return
+        
+        current, body = pending[-1]
+        try:
+            flow = body.throw(failed) if failed is not None else next(body)
+            failed = None
+        except StopIteration:
+            pending.pop()
+            flow, failed = None, None
+        except Exception as e:
+            pending.pop()
+            program.checked[id(current)] = e
+            flow, failed = None, e
+
+
+def link_flow(flow : FlowDef, program : Program) -> None:
+    '''Leaves on `flow` the subflow table a passing `semantic_check_flow` would; for flows whose check was cached.'''
+    flow.subftable = dict()
+    for stmt in flow.body.statements:
+        if type(stmt) == Let:
+            for each in stmt.idts: flow.subftable[each] = program.getflow(stmt.flow)
+
+
+def semantic_check_flowbody(flow : FlowDef, program : Program, callback : Callable = None) -> Iterator[FlowDef]:
     symbols = flow.proto.symbols if flow.proto.symbols is not None else []
     params = flow.proto.args if flow.proto.args is not None else []
     scope = symbols + params
@@ -761,21 +1345,18 @@ def semantic_check_flow(flow : FlowDef, program : Program, callback : Callable =
                     line=stmt.line, charpos=stmt.charpos
                 )
             
-            semantic_check_expr(stmt.right, scope, subfs, program)
+            yield from semantic_check_expr(stmt.right, scope, subfs, program)
             scope.append(stmt.left)
         
         elif type(stmt) == Let:
-            trigged = False
-            for fl in program.flows[::-1]:
-                if fl.name == stmt.flow:
-                    trigged = True
-                    for each in stmt.idts:
-                        subfs[each] = fl
-            if not trigged:
+            fl = program.getflow(stmt.flow)
+            if fl is None:
                 raise UnknownSubFlow(
                     f'Cannot find subflow `{stmt.flow}`!',
                     line=stmt.line, charpos=stmt.charpos
                 )
+            for each in stmt.idts:
+                subfs[each] = fl
         
         elif type(stmt) == Return:
             if type(stmt.value) == Tuple:
@@ -783,7 +1364,7 @@ def semantic_check_flow(flow : FlowDef, program : Program, callback : Callable =
                     f'Cannot return multiple types from a flow!', line=stmt.line, charpos=stmt.charpos
                 )
             
-            semantic_check_expr(stmt.value, scope, subfs, program)
+            yield from semantic_check_expr(stmt.value, scope, subfs, program)
 
 
 def semantic_check_buildbody(body : Body, flow : FlowDef, callback : Callable = None) -> None:
@@ -835,19 +1416,16 @@ def semantic_check_build(build : Build, program : Program, callback : Callable =
             line=build.line, charpos=build.charpos
         )
     
-    trigged = False
-    for each in program.flows:
-        if each.name == build.flow:
-            trigged = True
-            build.flow = each
+    flow = program.getflow(build.flow)
     
-    if not trigged:
+    if flow is None:
         raise UnknownFlow(
             f'Cannot find flow `{build.flow}`!',
             line=build.line, charpos=build.charpos
         )
     
     
+    build.flow = flow
     semantic_check_buildbody(build.body, build.flow, callback)
     
     
@@ -0,0 +1,123 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'leftPLUSMINUSleftMULDIVIDEMATMULrightUMINUSleftDOTleftLPARENLBRACKETBUILD COLON COMMA DIVIDE DOT EQUALS FLOW GT IDENTIFIER LBRACE LBRACKET LET LPAREN LT MATMUL MINUS MUL NUMBER PLUS RBRACE RBRACKET RETURN RPAREN SEMICOLONblocks : blocks flow\n              | blocks build\n              | flow\n              | build\n    build : BUILD term term body\n    flow : flowproto bodyflowproto : FLOW term\n                 | FLOW term symbols\n                 | FLOW term symbols params\n    flowproto : FLOW term params\n                 | FLOW term params symbols\n    symbols : LPAREN term RPAREN\n               | rtuple\n    params : LBRACKET term RBRACKET\n              | stuple\n    body : LBRACE statements RBRACEstatements : statements statement\n                  | statement\n    statement : retstmt\n                 | letstmt\n                 | assstmt\n                 | shapespec\n    shapespec : term EQUALS GT tuple SEMICOLON\n                 | term EQUALS GT tuple_s SEMICOLON\n                 | term EQUALS GT stuple SEMICOLON\n                 | term EQUALS GT rtuple SEMICOLON\n                 | term EQUALS GT term SEMICOLON\n                 | term EQUALS GT body SEMICOLON\n    retstmt : RETURN operand SEMICOLON\n               | RETURN tuple SEMICOLON\n               | RETURN tuple_s SEMICOLON\n               | RETURN stuple SEMICOLON\n               | RETURN rtuple SEMICOLON\n    assstmt : asslhs operand SEMICOLON\n               | asslhs tuple SEMICOLON\n               | asslhs tuple_s SEMICOLON\n               | asslhs stuple SEMICOLON\n               | asslhs rtuple SEMICOLON\n    asslhs : expr EQUALS\n              | tuple EQUALS\n              | tuple_s EQUALS\n              | stuple EQUALS\n              | rtuple EQUALS\n              | term EQUALS\n    letstmt : LET term term SEMICOLON\n               | LET term term stuple SEMICOLON\n    rtuple : LPAREN tuple RPAREN\n              | LPAREN tuple_s RPAREN\n    stuple : LBRACKET tuple RBRACKET\n              | LBRACKET tuple_s RBRACKET\n    tuple   : tuple_s operand\n               | tuple_s slice_l\n               | tuple_s slice_r\n               | tuple_s slice_e\n               | tuple_s stuple\n               | tuple_s rtuple\n               \n               | tuple COMMA operand\n               | tuple COMMA slice_l\n               | tuple COMMA slice_r\n               | tuple COMMA slice_e\n               | tuple COMMA stuple\n               | tuple COMMA rtuple\n    tuple_s : operand COMMA\n               | stuple COMMA\n               | rtuple COMMA\n               | slice_l COMMA\n               | slice_r COMMA\n               | slice_e COMMA\n    expr : term LPAREN operand RPAREN\n            | term LPAREN RPAREN\n            \n            | term rtuple\n    slice_l : term slice_e \n               | term slice_r\n    slice_r : slice_e term\n    slice_e : COLON\n    slice : LBRACKET slice_l RBRACKET\n             | LBRACKET slice_r RBRACKET\n             | LBRACKET slice_e RBRACKET\n             | LBRACKET term RBRACKET\n    operand : term\n               | expr\n    expr : operand PLUS operand\n            | operand MINUS operand\n            | operand MUL operand\n            | operand DIVIDE operand\n            | operand MATMUL operand\n            | operand DOT operand\n    expr : MINUS operand %prec UMINUS\n            \n            | operand stuple\n            | operand slice\n            \n            | LPAREN expr RPAREN\n    term : IDENTIFIER\n            | NUMBER\n    '
+
+_lr_action_items = {'BUILD':([0,1,2,3,7,8,9,45,107,],[5,5,-3,-4,-1,-2,-6,-16,-5,]),'FLOW':([0,1,2,3,7,8,9,45,107,],[6,6,-3,-4,-1,-2,-6,-16,-5,]),'$end':([1,2,3,7,8,9,45,107,],[0,-3,-4,-1,-2,-6,-16,-5,]),'LBRACE':([4,12,13,14,38,39,40,42,44,108,109,134,143,144,147,148,149,150,],[10,-92,-93,-7,10,-8,-10,-13,-15,-9,-11,10,-47,-48,-49,-50,-12,-14,]),'IDENTIFIER':([5,6,10,11,12,13,15,16,17,18,19,20,21,24,27,29,31,32,35,36,37,41,43,46,49,54,55,56,57,58,59,60,63,64,65,66,67,71,75,76,77,78,79,80,82,83,87,90,93,99,100,101,102,105,112,113,114,115,116,125,130,134,137,138,139,140,141,155,159,164,165,166,167,168,169,170,],[12,12,12,12,-92,-93,12,-18,-19,-20,-21,-22,12,12,12,12,12,12,12,12,-75,12,12,-17,12,12,12,12,12,12,12,12,-63,12,-40,12,-41,12,-42,-64,-43,-65,12,-44,12,12,12,-39,12,12,-66,-67,-68,12,-29,-30,-31,-32,-33,12,12,12,-34,-35,-36,-37,-38,-45,12,-46,-27,-23,-24,-25,-26,-28,]),'NUMBER':([5,6,10,11,12,13,15,16,17,18,19,20,21,24,27,29,31,32,35,36,37,41,43,46,49,54,55,56,57,58,59,60,63,64,65,66,67,71,75,76,77,78,79,80,82,83,87,90,93,99,100,101,102,105,112,113,114,115,116,125,130,134,137,138,139,140,141,155,159,164,165,166,167,168,169,170,],[13,13,13,13,-92,-93,13,-18,-19,-20,-21,-22,13,13,13,13,13,13,13,13,-75,13,13,-17,13,13,13,13,13,13,13,13,-63,13,-40,13,-41,13,-42,-64,-43,-65,13,-44,13,13,13,-39,13,13,-66,-67,-68,13,-29,-30,-31,-32,-33,13,13,13,-34,-35,-36,-37,-38,-45,13,-46,-27,-23,-24,-25,-26,-28,]),'RETURN':([10,15,16,17,18,19,20,46,112,113,114,115,116,137,138,139,140,141,155,164,165,166,167,168,169,170,],[21,21,-18,-19,-20,-21,-22,-17,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-45,-46,-27,-23,-24,-25,-26,-28,]),'LET':([10,15,16,17,18,19,20,46,112,113,114,115,116,137,138,139,140,141,155,164,165,166,167,168,169,170,],[27,27,-18,-19,-20,-21,-22,-17,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-45,-46,-27,-23,-24,-25,-26,-28,]),'MINUS':([10,12,13,15,16,17,18,19,20,21,22,24,28,29,30,31,32,36,41,43,46,47,49,52,53,54,55,56,57,58,59,60,61,62,63,64,65,66,67,68,74,75,76,77,78,80,81,82,85,87,90,91,93,94,97,98,99,100,101,102,105,106,110,111,112,113,114,115,116,117,118,119,120,121,122,126,127,134,135,136,137,138,139,140,141,142,143,144,145,146,147,148,151,152,153,154,155,157,159,163,164,165,166,167,168,169,170,],[32,-92,-93,32,-18,-19,-20,-21,-22,32,56,32,-80,32,-81,32,32,32,32,32,-17,56,32,-80,-81,32,32,32,32,32,32,32,-89,-90,-63,32,-40,32,-41,56,-80,-42,-64,-43,-65,-44,-71,32,56,32,-39,-81,32,-80,-88,-80,32,-66,-67,-68,32,56,-80,-80,-29,-30,-31,-32,-33,-82,-83,-84,-85,-86,-87,-80,56,32,56,-70,-34,-35,-36,-37,-38,-91,-47,-48,-80,56,-49,-50,-76,-77,-78,-79,-45,-80,32,-69,-46,-27,-23,-24,-25,-26,-28,]),'LPAREN':([10,12,13,14,15,16,17,18,19,20,21,24,28,29,31,32,36,40,41,43,44,46,49,52,54,55,56,57,58,59,60,63,64,65,66,67,74,75,76,77,78,80,82,87,90,93,94,98,99,100,101,102,105,110,111,112,113,114,115,116,126,134,137,138,139,140,141,145,147,148,150,155,157,159,164,165,166,167,168,169,170,],[31,-92,-93,41,31,-18,-19,-20,-21,-22,54,54,82,54,31,99,54,41,54,54,-15,-17,54,82,31,99,99,99,99,99,99,-63,54,-40,54,-41,82,-42,-64,-43,-65,-44,31,54,-39,54,82,82,99,-66,-67,-68,54,82,82,-29,-30,-31,-32,-33,82,54,-34,-35,-36,-37,-38,82,-49,-50,-14,-45,82,54,-46,-27,-23,-24,-25,-26,-28,]),'LBRACKET':([10,12,13,14,15,16,17,18,19,20,21,22,24,28,29,30,31,36,39,41,42,43,46,47,49,52,53,54,61,62,63,64,65,66,67,68,74,75,76,77,78,80,81,82,85,87,90,91,93,94,97,98,100,101,102,105,106,110,111,112,113,114,115,116,117,118,119,120,121,122,126,127,133,134,135,136,137,138,139,140,141,142,143,144,145,146,147,148,149,151,152,153,154,155,157,159,163,164,165,166,167,168,169,170,],[36,-92,-93,43,36,-18,-19,-20,-21,-22,36,64,36,-80,36,-81,36,36,43,36,-13,36,-17,64,36,-80,-81,36,-89,-90,-63,36,-40,36,-41,64,-80,-42,-64,-43,-65,-44,-71,36,64,36,-39,-81,36,-80,64,-80,-66,-67,-68,36,64,-80,-80,-29,-30,-31,-32,-33,64,64,64,64,64,64,-80,64,36,36,64,-70,-34,-35,-36,-37,-38,-91,-47,-48,-80,64,-49,-50,-12,-76,-77,-78,-79,-45,-80,36,-69,-46,-27,-23,-24,-25,-26,-28,]),'COLON':([10,12,13,15,16,17,18,19,20,21,24,28,29,31,36,41,43,46,49,52,54,63,64,65,66,67,74,75,76,77,78,80,82,87,90,93,94,100,101,102,105,110,111,112,113,114,115,116,126,134,137,138,139,140,141,155,157,159,164,165,166,167,168,169,170,],[37,-92,-93,37,-18,-19,-20,-21,-22,37,37,37,37,37,37,37,37,-17,37,37,37,-63,37,-40,37,-41,37,-42,-64,-43,-65,-44,37,37,-39,37,37,-66,-67,-68,37,37,37,-29,-30,-31,-32,-33,37,37,-34,-35,-36,-37,-38,-45,37,37,-46,-27,-23,-24,-25,-26,-28,]),'EQUALS':([12,13,23,24,25,26,28,30,37,53,61,62,63,68,69,70,71,72,73,74,76,78,81,83,84,97,98,100,101,102,103,117,118,119,120,121,122,127,128,129,130,131,132,136,142,143,144,147,148,151,152,153,154,163,],[-92,-93,65,67,75,77,80,90,-75,-81,-89,-90,-63,-51,-52,-53,-54,-55,-56,-80,-64,-65,-71,-72,-73,-88,-80,-66,-67,-68,-74,-82,-83,-84,-85,-86,-87,-57,-58,-59,-60,-61,-62,-70,-91,-47,-48,-49,-50,-76,-77,-78,-79,-69,]),'PLUS':([12,13,22,28,30,47,52,53,61,62,68,74,81,85,91,94,97,98,106,110,111,117,118,119,120,121,122,126,127,135,136,142,143,144,145,146,147,148,151,152,153,154,157,163,],[-92,-93,55,-80,-81,55,-80,-81,-89,-90,55,-80,-71,55,-81,-80,-88,-80,55,-80,-80,-82,-83,-84,-85,-86,-87,-80,55,55,-70,-91,-47,-48,-80,55,-49,-50,-76,-77,-78,-79,-80,-69,]),'MUL':([12,13,22,28,30,47,52,53,61,62,68,74,81,85,91,94,97,98,106,110,111,117,118,119,120,121,122,126,127,135,136,142,143,144,145,146,147,148,151,152,153,154,157,163,],[-92,-93,57,-80,-81,57,-80,-81,-89,-90,57,-80,-71,57,-81,-80,-88,-80,57,-80,-80,57,57,-84,-85,-86,-87,-80,57,57,-70,-91,-47,-48,-80,57,-49,-50,-76,-77,-78,-79,-80,-69,]),'DIVIDE':([12,13,22,28,30,47,52,53,61,62,68,74,81,85,91,94,97,98,106,110,111,117,118,119,120,121,122,126,127,135,136,142,143,144,145,146,147,148,151,152,153,154,157,163,],[-92,-93,58,-80,-81,58,-80,-81,-89,-90,58,-80,-71,58,-81,-80,-88,-80,58,-80,-80,58,58,-84,-85,-86,-87,-80,58,58,-70,-91,-47,-48,-80,58,-49,-50,-76,-77,-78,-79,-80,-69,]),'MATMUL':([12,13,22,28,30,47,52,53,61,62,68,74,81,85,91,94,97,98,106,110,111,117,118,119,120,121,122,126,127,135,136,142,143,144,145,146,147,148,151,152,153,154,157,163,],[-92,-93,59,-80,-81,59,-80,-81,-89,-90,59,-80,-71,59,-81,-80,-88,-80,59,-80,-80,59,59,-84,-85,-86,-87,-80,59,59,-70,-91,-47,-48,-80,59,-49,-50,-76,-77,-78,-79,-80,-69,]),'DOT':([12,13,22,28,30,47,52,53,61,62,68,74,81,85,91,94,97,98,106,110,111,117,118,119,120,121,122,126,127,135,136,142,143,144,145,146,147,148,151,152,153,154,157,163,],[-92,-93,60,-80,-81,60,-80,-81,-89,-90,60,-80,-71,60,-81,-80,60,-80,60,-80,-80,60,60,60,60,60,-87,-80,60,60,-70,-91,-47,-48,-80,60,-49,-50,-76,-77,-78,-79,-80,-69,]),'COMMA':([12,13,22,23,25,26,28,30,33,34,35,37,47,48,50,51,52,53,61,62,68,69,70,71,72,73,74,81,83,84,85,86,88,89,91,92,94,95,96,97,98,103,104,106,110,111,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,132,135,136,142,143,144,147,148,151,152,153,154,157,158,160,161,163,],[-92,-93,63,66,76,78,-80,-81,100,101,102,-75,63,66,76,78,-80,-81,-89,-90,-51,-52,-53,-54,-55,-56,-80,-71,-72,-73,63,66,76,78,-81,66,-80,78,76,-88,-80,-74,66,63,-80,-80,-82,-83,-84,-85,-86,-87,100,101,102,-80,-57,-58,-59,-60,-61,-62,63,-70,-91,-47,-48,-49,-50,-76,-77,-78,-79,-80,66,76,78,-69,]),'SEMICOLON':([12,13,37,45,47,48,49,50,51,52,53,61,62,63,68,69,70,71,72,73,74,76,78,81,83,84,85,86,87,88,89,97,98,100,101,102,103,117,118,119,120,121,122,127,128,129,130,131,132,133,136,142,143,144,147,148,151,152,153,154,156,157,158,159,160,161,162,163,],[-92,-93,-75,-16,112,113,114,115,116,-80,-81,-89,-90,-63,-51,-52,-53,-54,-55,-56,-80,-64,-65,-71,-72,-73,137,138,139,140,141,-88,-80,-66,-67,-68,-74,-82,-83,-84,-85,-86,-87,-57,-58,-59,-60,-61,-62,155,-70,-91,-47,-48,-49,-50,-76,-77,-78,-79,164,165,166,167,168,169,170,-69,]),'RPAREN':([12,13,37,52,53,61,62,63,68,69,70,71,72,73,74,76,78,81,82,83,84,91,92,93,97,98,100,101,102,103,110,117,118,119,120,121,122,127,128,129,130,131,132,135,136,142,143,144,147,148,151,152,153,154,163,],[-92,-93,-75,-80,-81,-89,-90,-63,-51,-52,-53,-54,-55,-56,-80,-64,-65,-71,136,-72,-73,142,143,144,-88,-80,-66,-67,-68,-74,149,-82,-83,-84,-85,-86,-87,-57,-58,-59,-60,-61,-62,163,-70,-91,-47,-48,-49,-50,-76,-77,-78,-79,-69,]),'RBRACKET':([12,13,37,53,61,62,63,68,69,70,71,72,73,74,76,78,81,83,84,97,98,100,101,102,103,104,105,111,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,132,136,142,143,144,147,148,151,152,153,154,163,],[-92,-93,-75,-81,-89,-90,-63,-51,-52,-53,-54,-55,-56,-80,-64,-65,-71,-72,-73,-88,-80,-66,-67,-68,-74,147,148,150,-82,-83,-84,-85,-86,-87,151,152,153,154,-57,-58,-59,-60,-61,-62,-70,-91,-47,-48,-49,-50,-76,-77,-78,-79,-69,]),'RBRACE':([15,16,17,18,19,20,46,112,113,114,115,116,137,138,139,140,141,155,164,165,166,167,168,169,170,],[45,-18,-19,-20,-21,-22,-17,-29,-30,-31,-32,-33,-34,-35,-36,-37,-38,-45,-46,-27,-23,-24,-25,-26,-28,]),'GT':([80,],[134,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'blocks':([0,],[1,]),'flow':([0,1,],[2,7,]),'build':([0,1,],[3,8,]),'flowproto':([0,1,],[4,4,]),'body':([4,38,134,],[9,107,162,]),'term':([5,6,10,11,15,21,24,27,29,31,32,35,36,41,43,49,54,55,56,57,58,59,60,64,66,71,79,82,83,87,93,99,105,125,130,134,159,],[11,14,28,38,28,52,74,79,52,94,98,103,74,110,111,74,94,98,98,98,98,98,98,126,74,103,133,52,103,74,74,145,74,103,103,157,74,]),'statements':([10,],[15,]),'statement':([10,15,],[16,46,]),'retstmt':([10,15,],[17,17,]),'letstmt':([10,15,],[18,18,]),'assstmt':([10,15,],[19,19,]),'shapespec':([10,15,],[20,20,]),'operand':([10,15,21,24,29,31,32,36,41,43,49,54,55,56,57,58,59,60,64,66,82,87,93,99,105,134,159,],[22,22,47,68,85,22,97,106,106,106,68,106,117,118,119,120,121,122,106,127,135,68,68,146,68,106,68,]),'tuple':([10,15,21,29,31,36,41,43,54,64,82,134,],[23,23,48,86,92,104,92,104,92,104,92,158,]),'tuple_s':([10,15,21,29,31,36,41,43,54,64,82,134,],[24,24,49,87,93,105,93,105,93,105,93,159,]),'stuple':([10,14,15,21,22,24,29,31,36,39,41,43,47,49,54,64,66,68,82,85,87,93,97,105,106,117,118,119,120,121,122,127,133,134,135,146,159,],[25,44,25,50,61,72,88,96,96,44,96,96,61,72,96,96,131,61,96,61,72,72,61,72,61,61,61,61,61,61,61,61,156,160,61,61,72,]),'rtuple':([10,14,15,21,24,28,29,31,36,40,41,43,49,52,54,64,66,74,82,87,93,94,98,105,110,111,126,134,145,157,159,],[26,42,26,51,73,81,89,95,95,42,95,95,73,81,95,95,132,81,95,73,73,81,81,73,81,81,81,161,81,81,73,]),'asslhs':([10,15,],[29,29,]),'expr':([10,15,21,24,29,31,32,36,41,43,49,54,55,56,57,58,59,60,64,66,82,87,93,99,105,134,159,],[30,30,53,53,53,91,53,53,53,53,53,91,53,53,53,53,53,53,53,53,53,53,53,91,53,53,53,]),'slice_l':([10,15,21,24,29,31,36,41,43,49,54,64,66,82,87,93,105,134,159,],[33,33,33,69,33,33,33,33,33,69,33,123,128,33,69,69,69,33,69,]),'slice_r':([10,15,21,24,28,29,31,36,41,43,49,52,54,64,66,74,82,87,93,94,105,110,111,126,134,157,159,],[34,34,34,70,84,34,34,34,34,34,70,84,34,124,129,84,34,70,70,84,70,84,84,84,34,84,70,]),'slice_e':([10,15,21,24,28,29,31,36,41,43,49,52,54,64,66,74,82,87,93,94,105,110,111,126,134,157,159,],[35,35,35,71,83,35,35,35,35,35,71,83,35,125,130,83,35,71,71,83,71,83,83,83,35,83,71,]),'symbols':([14,40,],[39,109,]),'params':([14,39,],[40,108,]),'slice':([22,47,68,85,97,106,117,118,119,120,121,122,127,135,146,],[62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> blocks","S'",1,None,None,None),
+  ('blocks -> blocks flow','blocks',2,'p_blocks','percy.py',28),
+  ('blocks -> blocks build','blocks',2,'p_blocks','percy.py',29),
+  ('blocks -> flow','blocks',1,'p_blocks','percy.py',30),
+  ('blocks -> build','blocks',1,'p_blocks','percy.py',31),
+  ('build -> BUILD term term body','build',4,'p_build','percy.py',39),
+  ('flow -> flowproto body','flow',2,'p_flowdef','percy.py',50),
+  ('flowproto -> FLOW term','flowproto',2,'p_flowproto','percy.py',60),
+  ('flowproto -> FLOW term symbols','flowproto',3,'p_flowproto','percy.py',61),
+  ('flowproto -> FLOW term symbols params','flowproto',4,'p_flowproto','percy.py',62),
+  ('flowproto -> FLOW term params','flowproto',3,'p_flowproto_params','percy.py',73),
+  ('flowproto -> FLOW term params symbols','flowproto',4,'p_flowproto_params','percy.py',74),
+  ('symbols -> LPAREN term RPAREN','symbols',3,'p_symbols','percy.py',86),
+  ('symbols -> rtuple','symbols',1,'p_symbols','percy.py',87),
+  ('params -> LBRACKET term RBRACKET','params',3,'p_params','percy.py',92),
+  ('params -> stuple','params',1,'p_params','percy.py',93),
+  ('body -> LBRACE statements RBRACE','body',3,'p_body','percy.py',101),
+  ('statements -> statements statement','statements',2,'p_statements','percy.py',108),
+  ('statements -> statement','statements',1,'p_statements','percy.py',109),
+  ('statement -> retstmt','statement',1,'p_statement','percy.py',117),
+  ('statement -> letstmt','statement',1,'p_statement','percy.py',118),
+  ('statement -> assstmt','statement',1,'p_statement','percy.py',119),
+  ('statement -> shapespec','statement',1,'p_statement','percy.py',120),
+  ('shapespec -> term EQUALS GT tuple SEMICOLON','shapespec',5,'p_shape_spec','percy.py',126),
+  ('shapespec -> term EQUALS GT tuple_s SEMICOLON','shapespec',5,'p_shape_spec','percy.py',127),
+  ('shapespec -> term EQUALS GT stuple SEMICOLON','shapespec',5,'p_shape_spec','percy.py',128),
+  ('shapespec -> term EQUALS GT rtuple SEMICOLON','shapespec',5,'p_shape_spec','percy.py',129),
+  ('shapespec -> term EQUALS GT term SEMICOLON','shapespec',5,'p_shape_spec','percy.py',130),
+  ('shapespec -> term EQUALS GT body SEMICOLON','shapespec',5,'p_shape_spec','percy.py',131),
+  ('retstmt -> RETURN operand SEMICOLON','retstmt',3,'p_retter','percy.py',137),
+  ('retstmt -> RETURN tuple SEMICOLON','retstmt',3,'p_retter','percy.py',138),
+  ('retstmt -> RETURN tuple_s SEMICOLON','retstmt',3,'p_retter','percy.py',139),
+  ('retstmt -> RETURN stuple SEMICOLON','retstmt',3,'p_retter','percy.py',140),
+  ('retstmt -> RETURN rtuple SEMICOLON','retstmt',3,'p_retter','percy.py',141),
+  ('assstmt -> asslhs operand SEMICOLON','assstmt',3,'p_asser','percy.py',146),
+  ('assstmt -> asslhs tuple SEMICOLON','assstmt',3,'p_asser','percy.py',147),
+  ('assstmt -> asslhs tuple_s SEMICOLON','assstmt',3,'p_asser','percy.py',148),
+  ('assstmt -> asslhs stuple SEMICOLON','assstmt',3,'p_asser','percy.py',149),
+  ('assstmt -> asslhs rtuple SEMICOLON','assstmt',3,'p_asser','percy.py',150),
+  ('asslhs -> expr EQUALS','asslhs',2,'p_ass_lhs','percy.py',157),
+  ('asslhs -> tuple EQUALS','asslhs',2,'p_ass_lhs','percy.py',158),
+  ('asslhs -> tuple_s EQUALS','asslhs',2,'p_ass_lhs','percy.py',159),
+  ('asslhs -> stuple EQUALS','asslhs',2,'p_ass_lhs','percy.py',160),
+  ('asslhs -> rtuple EQUALS','asslhs',2,'p_ass_lhs','percy.py',161),
+  ('asslhs -> term EQUALS','asslhs',2,'p_ass_lhs','percy.py',162),
+  ('letstmt -> LET term term SEMICOLON','letstmt',4,'p_letter','percy.py',168),
+  ('letstmt -> LET term term stuple SEMICOLON','letstmt',5,'p_letter','percy.py',169),
+  ('rtuple -> LPAREN tuple RPAREN','rtuple',3,'p_rtuple','percy.py',177),
+  ('rtuple -> LPAREN tuple_s RPAREN','rtuple',3,'p_rtuple','percy.py',178),
+  ('stuple -> LBRACKET tuple RBRACKET','stuple',3,'p_stuple','percy.py',185),
+  ('stuple -> LBRACKET tuple_s RBRACKET','stuple',3,'p_stuple','percy.py',186),
+  ('tuple -> tuple_s operand','tuple',2,'p_tuple_cont','percy.py',197),
+  ('tuple -> tuple_s slice_l','tuple',2,'p_tuple_cont','percy.py',198),
+  ('tuple -> tuple_s slice_r','tuple',2,'p_tuple_cont','percy.py',199),
+  ('tuple -> tuple_s slice_e','tuple',2,'p_tuple_cont','percy.py',200),
+  ('tuple -> tuple_s stuple','tuple',2,'p_tuple_cont','percy.py',201),
+  ('tuple -> tuple_s rtuple','tuple',2,'p_tuple_cont','percy.py',202),
+  ('tuple -> tuple COMMA operand','tuple',3,'p_tuple_cont','percy.py',204),
+  ('tuple -> tuple COMMA slice_l','tuple',3,'p_tuple_cont','percy.py',205),
+  ('tuple -> tuple COMMA slice_r','tuple',3,'p_tuple_cont','percy.py',206),
+  ('tuple -> tuple COMMA slice_e','tuple',3,'p_tuple_cont','percy.py',207),
+  ('tuple -> tuple COMMA stuple','tuple',3,'p_tuple_cont','percy.py',208),
+  ('tuple -> tuple COMMA rtuple','tuple',3,'p_tuple_cont','percy.py',209),
+  ('tuple_s -> operand COMMA','tuple_s',2,'p_tuple_start','percy.py',219),
+  ('tuple_s -> stuple COMMA','tuple_s',2,'p_tuple_start','percy.py',220),
+  ('tuple_s -> rtuple COMMA','tuple_s',2,'p_tuple_start','percy.py',221),
+  ('tuple_s -> slice_l COMMA','tuple_s',2,'p_tuple_start','percy.py',222),
+  ('tuple_s -> slice_r COMMA','tuple_s',2,'p_tuple_start','percy.py',223),
+  ('tuple_s -> slice_e COMMA','tuple_s',2,'p_tuple_start','percy.py',224),
+  ('expr -> term LPAREN operand RPAREN','expr',4,'p_call','percy.py',232),
+  ('expr -> term LPAREN RPAREN','expr',3,'p_call','percy.py',233),
+  ('expr -> term rtuple','expr',2,'p_call','percy.py',235),
+  ('slice_l -> term slice_e','slice_l',2,'p_slice_left','percy.py',242),
+  ('slice_l -> term slice_r','slice_l',2,'p_slice_left','percy.py',243),
+  ('slice_r -> slice_e term','slice_r',2,'p_slice_right','percy.py',250),
+  ('slice_e -> COLON','slice_e',1,'p_slice_empty','percy.py',258),
+  ('slice -> LBRACKET slice_l RBRACKET','slice',3,'p_slice','percy.py',264),
+  ('slice -> LBRACKET slice_r RBRACKET','slice',3,'p_slice','percy.py',265),
+  ('slice -> LBRACKET slice_e RBRACKET','slice',3,'p_slice','percy.py',266),
+  ('slice -> LBRACKET term RBRACKET','slice',3,'p_slice','percy.py',267),
+  ('operand -> term','operand',1,'p_operand','percy.py',276),
+  ('operand -> expr','operand',1,'p_operand','percy.py',277),
+  ('expr -> operand PLUS operand','expr',3,'p_binop','percy.py',283),
+  ('expr -> operand MINUS operand','expr',3,'p_binop','percy.py',284),
+  ('expr -> operand MUL operand','expr',3,'p_binop','percy.py',285),
+  ('expr -> operand DIVIDE operand','expr',3,'p_binop','percy.py',286),
+  ('expr -> operand MATMUL operand','expr',3,'p_binop','percy.py',287),
+  ('expr -> operand DOT operand','expr',3,'p_binop','percy.py',288),
+  ('expr -> MINUS operand','expr',2,'p_expr','percy.py',294),
+  ('expr -> operand stuple','expr',2,'p_expr','percy.py',296),
+  ('expr -> operand slice','expr',2,'p_expr','percy.py',297),
+  ('expr -> LPAREN expr RPAREN','expr',3,'p_expr','percy.py',299),
+  ('term -> IDENTIFIER','term',1,'p_term','percy.py',310),
+  ('term -> NUMBER','term',1,'p_term','percy.py',311),
+]
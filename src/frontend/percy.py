@@ -1,12 +1,28 @@
 import ply.yacc as yacc
+import os
 
 # Get the token map from the lexer
 from frontend.lexy import tokens
 from utils.nodes import *
 
 
+# Loosest first. Postfix calls and subscripts bind tightest, so `x.sum(1)` is `x.(sum(1))`.
+precedence = (
+    ('left', 'PLUS', 'MINUS'),
+    ('left', 'MUL', 'DIVIDE', 'MATMUL'),
+    ('right', 'UMINUS'),
+    ('left', 'DOT'),
+    ('left', 'LPAREN', 'LBRACKET'),
+)
 
 
+# Positions are taken from tokens and the nodes already built, never from PLY's position tracking of
+# nonterminals, so parsing with `tracking = False` builds the same AST.
+def position(node : Node | list) -> tuple[int, int]:
+    '''Line and character position of the first token of `node`, or of a tuple's first item.'''
+    while type(node) == list: node = node[0]
+    return node.line, node.charpos
+
 
 def p_blocks(p):
     '''blocks : blocks flow
@@ -36,111 +52,47 @@ def p_flowdef(p):
         name = p[1].name,
         proto = p[1],
         body = p[2],
-        line=p.lineno(1), charpos=p.lexpos(1)
+        line=p[1].line, charpos=p[1].charpos
     )
 
 
 def p_flowproto(p):
-    '''flowproto : flowproto LBRACKET term RBRACKET LPAREN term RPAREN
-                 | flowproto LPAREN term RPAREN LBRACKET term RBRACKET
-                 
-                 | flowproto LPAREN term RPAREN stuple
-                 | flowproto stuple LPAREN term RPAREN
-                 | flowproto LBRACKET term RBRACKET rtuple
-                 | flowproto rtuple LBRACKET term RBRACKET
-                 
-                 | flowproto LBRACKET term RBRACKET
-                 | flowproto LPAREN term RPAREN
-                 
-                 | flowproto stuple rtuple
-                 | flowproto rtuple stuple
-                 
-                 | flowproto stuple
-                 | flowproto rtuple
-                 
-                 | FLOW term
+    '''flowproto : FLOW term
+                 | FLOW term symbols
+                 | FLOW term symbols params
     '''
-    if len(p) == 8:
-        # print('single single')
-        if p[2] == '(':
-            p[0] = FlowProto(
-                name = p[1].name, 
-                symbols = [p[6]],
-                args = [p[3]],
-                line=p.lineno(1),
-                charpos=p.lexpos(1)
-            )
-        else:
-            p[0] = FlowProto(
-                name = p[1].name, 
-                symbols = [p[3]],
-                args = [p[6]],
-                line=p.lineno(1),
-                charpos=p.lexpos(1)
-            )
-    elif len(p) == 6:
-        # print('single tuple')
-        if p[2] == '(':
-            p[0] = FlowProto(
-                name = p[1].name, 
-                symbols = [p[3]],
-                args = p[5],
-                line=p.lineno(1),
-                charpos=p.lexpos(1)
-            )
-        elif p[3] == '(':
-            p[0] = FlowProto(
-                name = p[1].name, 
-                symbols = [p[4]],
-                args = p[2],
-                line=p.lineno(1),
-                charpos=p.lexpos(1)
-            )
-        elif p[2] == '[':
-            p[0] = FlowProto(
-                name = p[1].name, 
-                symbols = p[5],
-                args = [p[3]],
-                line=p.lineno(1),
-                charpos=p.lexpos(1)
-            )
-        elif p[3] == '[':
-            p[0] = FlowProto(
-                name = p[1].name, 
-                symbols = p[2],
-                args = [p[4]],
-                line=p.lineno(1),
-                charpos=p.lexpos(1)
-            )
-    elif len(p) == 5:
-        # print('single')
-        p[0] = FlowProto(
-            name = p[1].name,
-            symbols = p[3] if p[2] == '(' else None,
-            args = p[3] if p[2] == '[' else None,
-            line=p.lineno(1),
-            charpos=p.lexpos(1)
-        )
-    elif len(p) == 4:
-        # print('tuple tuple')
-        p[0] = FlowProto(
-            name = p[1].name, 
-            symbols = p[2] if p[2].bracks == 'round' else p[3],
-            args = p[3] if p[3].bracks == 'square' else p[2],
-            line=p.lineno(1),
-            charpos=p.lexpos(1)
-        )
-    else:
-        # print('tuple or none')
-        if p[1] == 'flow': p[0] = FlowProto(name = p[2], symbols = None, args = None)
-        else:
-            p[0] = FlowProto(
-                name = p[1].name,
-                symbols = p[2] if p[2].bracks == 'round' else None,
-                args = p[2] if p[2].bracks == 'square' else None,
-                line=p.lineno(1),
-                charpos=p.lexpos(1)
-            )
+    p[0] = FlowProto(
+        name = p[2],
+        symbols = p[3] if len(p) > 3 else None,
+        args = p[4] if len(p) > 4 else None,
+        line=p.lineno(1),
+        charpos=p.lexpos(1)
+    )
+
+def p_flowproto_params(p):
+    '''flowproto : FLOW term params
+                 | FLOW term params symbols
+    '''
+    p[0] = FlowProto(
+        name = p[2],
+        symbols = p[4] if len(p) > 4 else None,
+        args = p[3],
+        line=p.lineno(1),
+        charpos=p.lexpos(1)
+    )
+
+
+def p_symbols(p):
+    '''symbols : LPAREN term RPAREN
+               | rtuple
+    '''
+    p[0] = [p[2]] if len(p) == 4 else p[1]
+
+def p_params(p):
+    '''params : LBRACKET term RBRACKET
+              | stuple
+    '''
+    p[0] = [p[2]] if len(p) == 4 else p[1]
 
 
 
@@ -182,24 +134,23 @@ def p_shape_spec(p):
 
 
 def p_retter(p):
-    '''retstmt : RETURN expr SEMICOLON
+    '''retstmt : RETURN operand SEMICOLON
                | RETURN tuple SEMICOLON
                | RETURN tuple_s SEMICOLON
                | RETURN stuple SEMICOLON
                | RETURN rtuple SEMICOLON
-               | RETURN term SEMICOLON
     '''
     p[0] = Return(value=p[2], line=p.lineno(1), charpos=p.lexpos(1))
 
 def p_asser(p):
-    '''assstmt : asslhs expr SEMICOLON
+    '''assstmt : asslhs operand SEMICOLON
                | asslhs tuple SEMICOLON
                | asslhs tuple_s SEMICOLON
                | asslhs stuple SEMICOLON
                | asslhs rtuple SEMICOLON
-               | asslhs term SEMICOLON
     '''
-    p[0] = Assignment(left=p[1], right=p[2], line=p.lineno(1), charpos=p.lexpos(1))
+    line, charpos = position(p[1])
+    p[0] = Assignment(left=p[1], right=p[2], line=line, charpos=charpos)
     
 
 def p_ass_lhs(p):
@@ -226,14 +177,16 @@ def p_rtuple(p):
     '''rtuple : LPAREN tuple RPAREN
               | LPAREN tuple_s RPAREN
     '''
-    p[0] = Tuple(vals=p[2], bracks='round', line=p.lineno(2), charpos=p.lexpos(2))
+    line, charpos = position(p[2])
+    p[0] = Tuple(vals=p[2], bracks='round', line=line, charpos=charpos)
 
 
 def p_stuple(p):
     '''stuple : LBRACKET tuple RBRACKET
               | LBRACKET tuple_s RBRACKET
     '''
-    p[0] = Tuple(vals=p[2], bracks='square', line=p.lineno(2), charpos=p.lexpos(2))
+    line, charpos = position(p[2])
+    p[0] = Tuple(vals=p[2], bracks='square', line=line, charpos=charpos)
 
 
 
@@ -241,16 +194,14 @@ def p_stuple(p):
 
 
 def p_tuple_cont(p):
-    '''tuple   : tuple_s term
-               | tuple_s expr
+    '''tuple   : tuple_s operand
                | tuple_s slice_l
                | tuple_s slice_r
                | tuple_s slice_e
                | tuple_s stuple
                | tuple_s rtuple
                
-               | tuple COMMA term
-               | tuple COMMA expr
+               | tuple COMMA operand
                | tuple COMMA slice_l
                | tuple COMMA slice_r
                | tuple COMMA slice_e
@@ -265,8 +216,7 @@ def p_tuple_cont(p):
 
 
 def p_tuple_start(p):
-    '''tuple_s : term COMMA
-               | expr COMMA
+    '''tuple_s : operand COMMA
                | stuple COMMA
                | rtuple COMMA
                | slice_l COMMA
@@ -279,8 +229,7 @@ def p_tuple_start(p):
 
 
 def p_call(p):
-    '''expr : term LPAREN expr RPAREN
-            | term LPAREN term RPAREN
+    '''expr : term LPAREN operand RPAREN
             | term LPAREN RPAREN
             
             | term rtuple
@@ -298,8 +247,7 @@ def p_slice_left(p):
     p[0] = s
 
 def p_slice_right(p):
-    '''slice_r : slice_e term 
-               | slice_l term
+    '''slice_r : slice_e term
     '''
     s : Slice = p[1]
     s.right = p[2]
@@ -309,7 +257,7 @@ def p_slice_right(p):
 def p_slice_empty(p):
     '''slice_e : COLON
     '''
-    p[0] = Slice(left=0, right=-1, step=1, line=p.lineno(0), charpos=p.lexpos(0))
+    p[0] = Slice(left=0, right=-1, step=1, line=p.lineno(1), charpos=p.lexpos(1))
 
 
 def p_slice(p):
@@ -324,29 +272,38 @@ def p_slice(p):
 
 
 
+def p_operand(p):
+    '''operand : term
+               | expr
+    '''
+    p[0] = p[1]
+
+
+def p_binop(p):
+    '''expr : operand PLUS operand
+            | operand MINUS operand
+            | operand MUL operand
+            | operand DIVIDE operand
+            | operand MATMUL operand
+            | operand DOT operand
+    '''
+    p[0] = Op(value=p[2], left=p[1], right=p[3], line=p[1].line, charpos=p[1].charpos)
+
+
 def p_expr(p):
-    '''expr : term op term
-            | term op expr
-            | expr op expr
-            | expr op term
-            
-            | MINUS term
-            | MINUS expr
+    '''expr : MINUS operand %prec UMINUS
             
-            | term stuple
-            | term slice
-            | expr stuple
-            | expr slice
+            | operand stuple
+            | operand slice
             
             | LPAREN expr RPAREN
     '''
     if len(p) == 3:
         if p[1] == '-':
-            p[0] = Op(value='-', left=None, right=p[2], line=p.lineno(2), charpos=p.lexpos(2))
+            p[0] = Op(value='-', left=None, right=p[2], line=p[2].line, charpos=p[2].charpos)
         else:
-            p[0] = Op(name='slice', left=p[1], right=p[2], line=p.lineno(1), charpos=p.lexpos(1))
-    elif p[1] == '(': p[0] = p[2]
-    else : p[0] = Op(value=p[2], left=p[1], right=p[3], line=p.lineno(1), charpos=p.lexpos(1))
+            p[0] = Op(name='slice', left=p[1], right=p[2], line=p[1].line, charpos=p[1].charpos)
+    else: p[0] = p[2]
 
 
 def p_term(p):
@@ -356,24 +313,18 @@ def p_term(p):
     p[0] = Term(line = p.lineno(1), charpos=p.lexpos(1), value=p[1])
 
 
-def p_ops(p):
-    '''op : PLUS
-          | MINUS
-          | MUL
-          | DIVIDE
-          | MATMUL
-          | DOT
-    '''
-    p[0] = p[1]
-
-
 
 
 
 def p_error(p):
     if p: raise InvalidSyntax(f"Syntax error at '{p.value}' on line number {p.lineno}!", line = p.lineno)
-    else : print('End of file (maybe?)')
+    else : raise InvalidSyntax('Unexpected end of file!')
 
 
-# Build the parser
-parser = yacc.yacc()
\ No newline at end of file
+# Build the parser, from the tables shipped in `frontend/parsetab.py`. Optimized mode skips the
+# grammar signature check, so regenerate them with `python -m frontend.tables` after editing any rule.
+# Nothing is written at runtime; missing tables only cost a rebuild in memory.
+parser = yacc.yacc(
+    optimize = True, tabmodule = 'frontend.parsetab', write_tables = False, debug = False,
+    outputdir = os.path.dirname(__file__)
+)
\ No newline at end of file
@@ -0,0 +1,205 @@
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Any
+
+import functools, inspect, time, json, sys
+
+
+# `--profile`: while a `Profiler` is active, every stage of the compiler runs inside a `phase`, and the
+# per-flow functions of `frontend.middle` are swapped for counting wrappers. Otherwise nothing is
+# wrapped and `phase` does nothing. Phases don't nest.
+
+profiler : 'Profiler' = None
+
+def phase(name : str):
+    return profiler.phase(name) if profiler is not None else nullcontext()
+
+
+# the per-flow (or per-build) functions timed, each taking the node it works on first
+hooks = ['semantic_check_flowbody', 'semantic_check_build', 'flowlengths_flow', 'flowshape_flow']
+counters = ['statements', 'dimensions', 'shapelengths', 'consolidations', 'replayed']
+
+
+class Profiler:
+    '''
+    Wall time, memory and work counts of every phase of a compile, and per flow (inclusive of subflows),
+    written to `<prefix>.json` when the block exits. `process_peak_rss` is the process's peak resident set
+    size so far at the end of each phase: it only grows, so it tells when the process peaked, not what
+    each phase used. With `detail`, `phase_peak_traced` is the peak of each phase's own Python
+    allocations, and a cProfile of the whole run is written to `<prefix>.pstats`; tracing both slows the
+    compile several times over, so plain profiles leave them out.
+    '''
+    def __init__(self, prefix : str = 'flow.profile', detail : bool = False) -> None:
+        self.prefix = prefix
+        self.detail = detail
+        self.counts = dict.fromkeys(counters, 0)
+        self.phases : list[dict] = []
+        self.flows : dict[tuple[str, str], dict] = dict()
+        self.saved : list[tuple[Any, str, Any]] = []
+        self.start = None
+    
+    def count(self, counter : str, n : int = 1) -> None:
+        self.counts[counter] += n
+    
+    
+    def maxrss(self) -> int | None:
+        try: import resource
+        except ImportError: return None
+        # kilobytes on Linux, bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    
+    @contextmanager
+    def phase(self, name : str):
+        import tracemalloc
+        
+        before = dict(self.counts)
+        if self.detail:
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        
+        try: yield
+        finally:
+            record = {
+                'phase' : name, 'wall' : time.perf_counter() - start, 'process_peak_rss' : self.maxrss(),
+                'phase_peak_traced' : None
+            }
+            if self.detail: record['phase_peak_traced'] = max(0, tracemalloc.get_traced_memory()[1] - current)
+            record.update({x : self.counts[x] - before[x] for x in counters})
+            self.phases.append(record)
+    
+    def timed(self, hook : str, function : Callable) -> Callable:
+        def enter(node) -> tuple[dict, float]:
+            before = dict(self.counts)
+            self.count('statements', len(node.body.statements))
+            return before, time.perf_counter()
+        
+        def leave(node, before : dict, start : float) -> None:
+            record = self.flows.setdefault((hook, node.name), {
+                'function' : hook, 'flow' : node.name, 'calls' : 0, 'wall' : 0.0, **dict.fromkeys(counters, 0)
+            })
+            record['calls'] += 1
+            record['wall'] += time.perf_counter() - start
+            for x in counters: record[x] += self.counts[x] - before[x]
+        
+        # the checks and inference run as generators, driven on a stack by their callers: timed from
+        # their first step to their last, which takes in their subflows as the plain calls do
+        if inspect.isgeneratorfunction(function):
+            @functools.wraps(function)
+            def generator(node, *args, **kwargs):
+                before, start = enter(node)
+                try: return (yield from function(node, *args, **kwargs))
+                finally: leave(node, before, start)
+            
+            return generator
+        
+        @functools.wraps(function)
+        def wrapper(node, *args, **kwargs):
+            before, start = enter(node)
+            try: return function(node, *args, **kwargs)
+            finally: leave(node, before, start)
+        
+        return wrapper
+    
+    def counted(self, counter : str, function : Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            self.count(counter)
+            return function(*args, **kwargs)
+        
+        return wrapper
+    
+    def patch(self, owner : Any, name : str, wrapper : Callable) -> None:
+        self.saved.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, wrapper)
+    
+    
+    def install(self) -> None:
+        import frontend.middle as middle
+        import frontend.compiler as compiler
+        
+        for hook in hooks:
+            wrapper = self.timed(hook, getattr(middle, hook))
+            # `frontend.compiler` holds its own references to the functions it calls directly
+            for module in [middle, compiler]:
+                if hasattr(module, hook): self.patch(module, hook, wrapper)
+        
+        self.patch(middle, 'consolidate', self.counted('consolidations', middle.consolidate))
+        self.patch(middle.Instance, 'apply', self.counted('replayed', middle.Instance.apply))
+        
+        new = middle.DimSolver.new
+        def allocate(solver : middle.DimSolver):
+            self.count('dimensions' if solver.kind == middle.Dimension else 'shapelengths')
+            return new(solver)
+        self.patch(middle.DimSolver, 'new', allocate)
+    
+    def uninstall(self) -> None:
+        while self.saved:
+            owner, name, original = self.saved.pop()
+            setattr(owner, name, original)
+    
+    
+    def __enter__(self) -> 'Profiler':
+        import cProfile, tracemalloc
+        global profiler
+        
+        self.install()
+        profiler = self
+        if self.detail:
+            tracemalloc.start()
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        import tracemalloc
+        global profiler
+        
+        self.wall = time.perf_counter() - self.start
+        self.peak = None
+        if self.detail:
+            self.cprofile.disable()
+            self.peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        profiler = None
+        self.uninstall()
+        
+        # also on failure (the front exits on errors), so a failed compile can be profiled too
+        self.dump()
+        self.show()
+    
+    
+    def report(self) -> dict:
+        return {
+            'wall' : self.wall, 'process_peak_rss' : self.maxrss(), 'peak_traced' : self.peak, 'phases' : self.phases,
+            'flows' : sorted(self.flows.values(), key = lambda x: -x['wall'])
+        }
+    
+    def dump(self) -> None:
+        with open(f'{self.prefix}.json', 'w') as file:
+            json.dump(self.report(), file, indent = '\t')
+        if self.detail: self.cprofile.dump_stats(f'{self.prefix}.pstats')
+    
+    def show(self, top : int = 10) -> None:
+        from utils.logging import reporter
+        if reporter.quiet: return
+        
+        def kib(x : int | None) -> str: return f'{x / 1024:.1f}' if x is not None else '-'
+        
+        # the process's peak RSS so far, and with `detail` the peak traced by each phase itself
+        print(f'{"phase":<18}{"ms":>10}{"proc RSS KiB":>14}{"phase KiB":>11}' + ''.join(f'{x:>15}' for x in counters))
+        for each in self.phases:
+            print(
+                f'{each["phase"]:<18}{each["wall"] * 1000:>10.2f}{kib(each["process_peak_rss"]):>14}{kib(each["phase_peak_traced"]):>11}' +
+                ''.join(f'{each[x]:>15}' for x in counters)
+            )
+        print(f'{"total":<18}{self.wall * 1000:>10.2f}{kib(self.maxrss()):>14}{kib(self.peak):>11}')
+        
+        flows = self.report()['flows'][:top]
+        if flows:
+            print()
+            print(f'{"slowest flows":<40}{"calls":>8}{"ms":>10}{"statements":>12}')
+            for each in flows:
+                print(f'{each["function"] + " " + each["flow"]:<40}{each["calls"]:>8}{each["wall"] * 1000:>10.2f}{each["statements"]:>12}')
+        
+        print(f'Profile written to `{self.prefix}.json`' + (f' and `{self.prefix}.pstats`.' if self.detail else '.'))
@@ -0,0 +1,136 @@
+from frontend.lexy import lexer
+from frontend.percy import parser
+from frontend.middle import iron
+from utils.nodes import *
+
+from ply.lex import Lexer
+from ply.yacc import LRParser
+from dataclasses import fields, is_dataclass
+from typing import Callable, Iterator
+
+import re
+
+
+
+# Sources too large to hold in memory are split into their top-level definitions while being read, and
+# parsed and ironed one definition at a time, so only the AST and the largest definition's text are ever
+# held. `frontend.cache` parses its cached definitions the same way.
+
+blockpattern = re.compile(r'//.*|[{}]')
+commentpattern = re.compile(r'//.*')
+
+chunksize = 1 << 20
+
+
+def definitions(path : str, size : int = chunksize) -> Iterator[tuple[str, int, int]]:
+    '''
+    Splits the file at `path` into the text of its top-level definitions, each with the line and character
+    it starts at, reading `size` characters at a time. Each runs from the end of the previous one to its
+    closing brace; unbalanced braces and anything but comments after the last one come out as a final
+    piece, for the parser to report.
+    '''
+    pending, depth, line, offset, carry = [], 0, 1, 0, ''
+    
+    with open(path, 'r') as file:
+        while True:
+            chunk = file.read(size)
+            text = carry + chunk
+            # whole lines only, so a comment is never split from its `//`
+            if chunk:
+                cut = text.rfind('\n') + 1
+                text, carry = text[:cut], text[cut:]
+            
+            start = 0
+            for match in blockpattern.finditer(text):
+                if match.group() == '{': depth += 1
+                elif match.group() == '}':
+                    depth -= 1
+                    if depth > 0: continue
+                    
+                    depth = 0
+                    pending.append(text[start : match.end()])
+                    start = match.end()
+                    
+                    piece = ''.join(pending)
+                    yield piece, line, offset
+                    line, offset, pending = line + piece.count('\n'), offset + len(piece), []
+            pending.append(text[start:])
+            
+            if not chunk: break
+    
+    piece = ''.join(pending)
+    if commentpattern.sub('', piece).strip(): yield piece, line, offset
+
+
+def parse_text(
+    text : str, line : int = 1, lexer : Lexer = lexer, parser : LRParser = parser, tracking : bool = False
+) -> list[FlowDef | Build]:
+    '''
+    Parses `text`, numbering its lines from `line`; the lexer and parser keep nothing of it afterwards. The
+    grammar never reads PLY's `tracking` positions, which only slow the parse down, so it is off by default.
+    '''
+    lexer.input(text)
+    lexer.lineno = line
+    try: return parser.parse(text, lexer = lexer, tracking = tracking)
+    finally:
+        # the lexer holds on to the text, and the parser to its stacks, with the whole AST on top
+        lexer.input('')
+        parser.statestack, parser.symstack = [], []
+
+
+def parse_definition(text : str, line : int = 1, lexer : Lexer = lexer, parser : LRParser = parser) -> FlowDef | Build:
+    '''Parses and irons the single definition `text`, numbering its lines from `line`.'''
+    ast = parse_text(text, line, lexer, parser)
+    if (ast is None) or (len(ast) != 1):
+        raise InvalidSyntax(f'Expected one flow or build on line number {line}!', line = line)
+    
+    node = ast[0]
+    if type(node) == FlowDef: iron(Program(flows = [node], builds = []))
+    else: iron(Program(flows = [], builds = [node]))
+    return node
+
+
+children : dict[type, tuple[str, ...] | None] = dict()
+
+def shift(node : Any, lines : int, chars : int) -> None:
+    '''Moves every position under `node` down by `lines` lines and `chars` characters.'''
+    # the parser shares one int between the nodes at a position; `moved` keeps them shared, or
+    # every node of a large program would hold two ints of its own
+    seen, lineat, charat = set(), {None : None}, {None : None}
+    
+    # on a stack of our own: long expressions are as deep as they are long
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        kind = type(node)
+        if kind in [list, tuple]:
+            pending.extend(reversed(node))
+            continue
+        
+        if kind not in children:
+            children[kind] = tuple(
+                x.name for x in fields(node) if x.name not in ['line', 'charpos', '_hash']
+            ) if is_dataclass(node) else None
+        if (children[kind] is None) or (id(node) in seen): continue
+        
+        seen.add(id(node))
+        if node.line not in lineat: lineat[node.line] = node.line + lines
+        if node.charpos not in charat: charat[node.charpos] = node.charpos + chars
+        node.line, node.charpos = lineat[node.line], charat[node.charpos]
+        pending.extend(getattr(node, each, None) for each in reversed(children[kind]))
+
+
+def parse_stream(path : str, size : int = chunksize, parse : Callable = parse_definition) -> Program:
+    '''Parses and irons the file at `path` one definition at a time; the `Program` keeps its `path` but not its text.'''
+    nodes = []
+    for text, line, offset in definitions(path, size):
+        node = parse(text, line)
+        shift(node, 0, offset)
+        nodes.append(node)
+    
+    return Program(
+        name = None,
+        flows = list(filter(lambda x: type(x) == FlowDef, nodes)),
+        builds = list(filter(lambda x: type(x) == Build, nodes)),
+        path = path
+    )
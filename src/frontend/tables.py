@@ -0,0 +1,74 @@
+import ply.lex as lex
+import ply.yacc as yacc
+import argparse, tempfile, os, sys
+
+
+# Regenerates the PLY tables shipped with the package (`lextab.py` and `parsetab.py`),
+# so the CLI never has to build the lexer or the LALR tables at startup.
+# Run from `src/` after changing the grammar, and before building a release:
+#
+#     python -m frontend.tables
+#
+# The tables are loaded in optimized mode, which trusts them without checking them against the
+# grammar. `python -m frontend.tables --check` does, and exits 1 if either is stale; run it in CI.
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+
+def generate() -> None:
+    from frontend import lexy, percy
+    
+    for each in ['lextab.py', 'parsetab.py']:
+        if os.path.exists(os.path.join(here, each)): os.remove(os.path.join(here, each))
+    for each in ['frontend.lextab', 'frontend.parsetab']:
+        sys.modules.pop(each, None)
+    
+    lex.lex(module = lexy, optimize = True, lextab = 'frontend.lextab', outputdir = here)
+    # `debug` only so PLY counts the grammar's conflicts, which must stay at none; the log itself is dropped
+    yacc.yacc(
+        module = percy, tabmodule = 'frontend.parsetab', outputdir = here,
+        write_tables = True, debug = True, debuglog = yacc.NullLogger()
+    )
+
+
+def stale() -> list[str]:
+    '''The shipped tables that are missing, or no longer match the rules in `lexy.py` and `percy.py`.'''
+    from frontend import lexy, percy
+    
+    found = []
+    
+    # lexer tables carry no signature: write out the rules' own and compare
+    with tempfile.TemporaryDirectory() as directory:
+        lex.lex(module = lexy).writetab('lextab', directory)
+        with open(os.path.join(directory, 'lextab.py'), 'r') as file: fresh = file.read()
+    try:
+        with open(os.path.join(here, 'lextab.py'), 'r') as file: shipped = file.read()
+    except FileNotFoundError: shipped = None
+    if fresh != shipped: found.append('lextab.py')
+    
+    # parser tables are signed with the start symbol, precedence, tokens and rules, which is all PLY
+    # compares when it is not optimized
+    rules = yacc.ParserReflect(vars(percy))
+    rules.get_all()
+    try: from frontend import parsetab
+    except ImportError: parsetab = None
+    if (parsetab is None) or (rules.signature() != parsetab._lr_signature): found.append('parsetab.py')
+    
+    return found
+
+
+if __name__ == '__main__':
+    cliparser = argparse.ArgumentParser(prog = 'python -m frontend.tables', description = 'Regenerates the PLY tables shipped with the package.')
+    cliparser.add_argument('--check', action = 'store_true', help = 'Only check the tables are up to date with the grammar; exits 1 if not.')
+    args = cliparser.parse_args()
+    
+    if args.check:
+        found = stale()
+        if found:
+            print(f'Stale tables in `{here}`: {", ".join(found)}. Regenerate them with `python -m frontend.tables`.')
+            sys.exit(1)
+        print(f'Tables in `{here}` are up to date.')
+        sys.exit()
+    
+    generate()
+    print(f'Tables written to `{here}`.')
@@ -1,18 +1,44 @@
 from typing import Callable, Any
 
+from array import array
+
+import mmap, time, sys, re
+
 #-----------------------------------------------------------------------------------------------------------------------------
 #terminal logging stuff
 
 check = '✅'
 loaders = "⣾⣽⣻⢿⡿⣟⣯⣷"
-index = 0
+
+class Reporter:
+    '''
+    Spinner line for long-running stages. Redrawn at most `rate` times a second, and only when stdout is a
+    terminal, so callers can report every statement for free; the message is only built when drawn.
+    `quiet` silences the spinner and the one-line stage messages sent through `step` as well.
+    '''
+    def __init__(self, rate : float = 10, quiet : bool = False) -> None:
+        self.interval = 1 / rate
+        self.quiet = quiet
+        self.last = 0.0
+        self.index = 0
+    
+    def __call__(self, strgen : Callable[[Any], str], *args) -> None:
+        if self.quiet: return
+        now = time.monotonic()
+        if now - self.last < self.interval: return
+        self.last = now
+        if not sys.stdout.isatty(): return
+        
+        print(f'{loaders[self.index]} {strgen(*args)}', end='\r', flush=True)
+        self.index = (self.index + 1) % len(loaders)
+    
+    def step(self, report : Callable[[str], Any], message : str) -> None:
+        if not self.quiet: report(message)
+
+reporter = Reporter()
 
 def loading(strgen : Callable[[Any], str], *args):
-    global index
-    strval = strgen(*args)
-    print(f'{loaders[index]} {strval}', end='\r')
-    index += 1
-    if index >= len(loaders): index = 0
+    reporter(strgen, *args)
 
 
 def checked(val : str) -> str: return f'{check} {val}'
@@ -28,17 +54,58 @@ def removetabs(val : str) -> str:
     return ''.join(new)
 
 
+class Lines:
+    '''
+    Line-offset index of a source, built once, so any line can be read without splitting the whole text.
+    `Lines.open` maps a file into memory instead of reading it; its lines are decoded as they are read.
+    '''
+    def __init__(self, data : str | mmap.mmap) -> None:
+        self.data = data
+        newline = '\n' if type(data) == str else b'\n'
+        self.starts = array('q', [0])
+        self.starts.extend(match.end() for match in re.finditer(re.escape(newline), data))
+        # like `str.splitlines`, no empty line after a final newline
+        if self.starts[-1] == len(data): self.starts.pop()
+    
+    @classmethod
+    def open(cls, path : str) -> 'Lines':
+        with open(path, 'rb') as file:
+            if not file.seek(0, 2): return cls('')
+            return cls(mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ))
+    
+    def __len__(self) -> int: return len(self.starts)
+    
+    def __getitem__(self, index : int) -> str:
+        end = self.starts[index + 1] if index + 1 < len(self.starts) else len(self.data)
+        line = self.data[self.starts[index] : end]
+        if type(line) != str: line = line.decode('utf-8', errors = 'replace')
+        return line.rstrip('\r\n')
+
+
+# the index of the last text excerpted, since chains excerpt the same source over and over
+indexed : tuple[str, Lines] = (None, None)
+
+def lines(file : str | Lines) -> Lines:
+    global indexed
+    if type(file) == Lines: return file
+    # read once: another thread may replace the entry in between
+    entry = indexed
+    if entry[0] is not file: entry = indexed = (file, Lines(file))
+    return entry[1]
+
+
 tr = '╮'
 bl = '╰'
 tl = '╭'
 br = '╯'
-def excerpt(file : str, lineno : int, cols : int = 60) -> str:
+def excerpt(file : str | Lines, lineno : int, cols : int = 60) -> str:
     lineno -= 1
     
     rows = 3
     
+    source = lines(file)
     start = lineno - (rows // 2) if lineno >= (rows // 2) else 0
-    region = file.splitlines()[ start : lineno + (rows // 2) + 1]
+    region = [source[i] for i in range(start, min(lineno + (rows // 2) + 1, len(source)))]
     
     for i, each in enumerate(region):
         each = removetabs(each)[:cols]
@@ -1,41 +1,54 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Literal
 
 
 
 
-@dataclass
+@dataclass(slots = True)
 class Node:
     line : int = None
     charpos : int = None
+    _hash : int = field(default = None, init = False, repr = False, compare = False)
     def __repr__(self) -> str:
         # return f'{self.line}:' + self.__str__()
         return self.__str__()
     def __str__(self) -> str:
         return ''
+    def key(self) -> tuple:
+        # structural identity of the node; `line`/`charpos` are not part of it
+        return ()
+    def touch(self) -> None:
+        # drops the cached hash, call after mutating a node in place
+        self._hash = None
     def __hash__(self) -> int:
-        return self.__repr__().__hash__()
+        h = self._hash
+        if h is None:
+            h = self._hash = hash((type(self), self.key()))
+        return h
     def __eq__(self, value: object) -> bool:
         if type(self) != type(value): return False
-        return self.__hash__() == value.__hash__()
+        return (self is value) or (self.key() == value.key())
     def __ne__(self, value: object) -> bool:
-        if type(self) != type(value): return True
-        return self.__hash__() != value.__hash__()
+        return not self.__eq__(value)
 
 
-@dataclass(repr = False)
+@dataclass(repr = False, eq = False, slots = True)
 class Term(Node):
     value : str | float | int = None
     def __str__(self) -> str:
         return f'T({self.value})'
+    def key(self) -> tuple:
+        return (self.value,)
 
 
 class Dimension(Node):
-    num : int = 0
+    __slots__ = ('id',)
     
-    def __init__(self) -> None:
-        self.id = Dimension.num
-        Dimension.num += 1
+    # allocated by the `DimSolver` of a build, so ids are per build and never shared between compiles
+    def __init__(self, id : int) -> None:
+        # slots have no class-level defaults to fall back on, unlike the attributes of a `__dict__`
+        self.line = self.charpos = self._hash = None
+        self.id = id
         
     def __str__(self) -> str:
         return f'_{self.id}'
@@ -47,14 +60,17 @@ class Dimension(Node):
     def __ne__(self, value: object) -> bool:
         if type(value) != Dimension: return True
         return self.id != value.id
+    
+    def __hash__(self) -> int:
+        return self.id
 
 
 class ShapeLength(Node):
-    num : int = 0
+    __slots__ = ('id',)
     
-    def __init__(self) -> None:
-        self.id = ShapeLength.num
-        ShapeLength.num += 1
+    def __init__(self, id : int) -> None:
+        self.line = self.charpos = self._hash = None
+        self.id = id
         
     def __str__(self) -> str:
         return f'SL({self.id})'
@@ -66,11 +82,14 @@ class ShapeLength(Node):
     def __ne__(self, value: object) -> bool:
         if type(value) != ShapeLength: return True
         return self.id != value.id
+    
+    def __hash__(self) -> int:
+        return self.id
 
 
 
 
-@dataclass(repr = False)
+@dataclass(repr = False, eq = False, slots = True)
 class Tuple(Node):
     vals : list[Node] = None
     bracks : Literal['round', 'square', 'none'] = None
@@ -81,9 +100,12 @@ class Tuple(Node):
     def __str__(self) -> str:
         return f'tup({", ".join(list(map(lambda x: str(x), self.vals)))})'
     
+    def key(self) -> tuple:
+        return (self.bracks, tuple(self.vals) if self.vals is not None else None)
+    
 
 
-@dataclass(repr = False, eq = False)
+@dataclass(repr = False, eq = False, slots = True)
 class Shape(Node):
     dims : list[int | Node] = None
     length : ShapeLength | int = None
@@ -100,6 +122,13 @@ class Shape(Node):
     def __str__(self) -> str:
         return f'Shape({self.length}, {self.dims})'
     
+    def key(self) -> tuple:
+        return (self.length, tuple(self.dims) if self.dims is not None else None)
+    
+    # dims are rewritten in place all through inference, so the hash is never cached
+    def __hash__(self) -> int:
+        return hash((Shape, self.key()))
+    
     # def __eq__(self, value: object) -> bool:
     #     if type(self) != type(value): return False
     #     return self.dims == value.dims
@@ -114,13 +143,15 @@ class Shape(Node):
     #     else: return '_empty_'
 
 
-@dataclass(repr = False)
+@dataclass(repr = False, eq = False, slots = True)
 class Expr(Node):
     value : Node = None
     shape : Shape = None
+    def key(self) -> tuple:
+        return (self.value,)
 
 
-@dataclass(repr = False, eq = False)
+@dataclass(repr = False, eq = False, slots = True)
 class Var(Node):
     name : str = None
     
@@ -143,6 +174,7 @@ class Var(Node):
 
 
 class Symbol(Var):
+    __slots__ = ()
     def __str__(self) -> str:
         return self.name
         # return f'Symbol({self.name})'
@@ -150,6 +182,7 @@ class Symbol(Var):
         return f'Symbol({self.name})'
 
 class Arg(Var):
+    __slots__ = ()
     def __str__(self) -> str:
         return self.name
         # return f'Arg({self.name})'
@@ -159,7 +192,7 @@ class Arg(Var):
 
 
 
-@dataclass(repr=False, eq=False)
+@dataclass(repr=False, eq=False, slots = True)
 class Number(Node):
     value : float | int = None
     def __eq__(self, value: object) -> bool:
@@ -170,20 +203,24 @@ class Number(Node):
             return self.value == value
     def __str__(self) -> str:
         return f'N({self.value})'
+    def key(self) -> tuple:
+        return (self.value,)
     def __hash__(self) -> int:
-        return self.__repr__().__hash__()
+        return hash(self.value)
 
 
 
-@dataclass(repr=False, eq=False)
+@dataclass(repr=False, eq=False, slots = True)
 class Op(Expr):
     left : Expr = None
     right : Expr = None
     def __str__(self) -> str:
         return f'Op({self.value}, left={self.left}, right={self.right})'
+    def key(self) -> tuple:
+        return (self.value, self.left, self.right)
 
 
-@dataclass(repr = False, eq=False)
+@dataclass(repr = False, eq=False, slots = True)
 class Statement:
     line : int = None
     charpos : int = None
@@ -192,7 +229,7 @@ class Statement:
         return (f'{self.line}:' + self.__str__())
 
 
-@dataclass(repr = False, eq=False)
+@dataclass(repr = False, eq=False, slots = True)
 class Return(Statement):
     value : (
         Expr | Var |
@@ -202,7 +239,7 @@ class Return(Statement):
     def __str__(self) -> str:
         return f'Return({self.value})'
 
-@dataclass(repr = False, eq = False)
+@dataclass(repr = False, eq = False, slots = True)
 class Let(Statement):
     flow : Node = None
     idts : list[Node] = None
@@ -212,7 +249,7 @@ class Let(Statement):
         return f'Let({self.flow}, {self.idts})'
 
 
-@dataclass(repr=False, eq = False)
+@dataclass(repr=False, eq = False, slots = True)
 class Assignment(Statement):
     left : Expr = None
     right : Expr = None
@@ -260,7 +297,7 @@ class FlowDef(Node):
     def __str__(self) -> str:
         return f'FlowDef({self.name}, symbols={self.proto.symbols}, args={self.proto.args}, statements={len(self.body.statements)})'
 
-@dataclass(repr=False, eq = False)
+@dataclass(repr=False, eq = False, slots = True)
 class ShapeSpec(Statement):
     var : Node = None
     shape : Shape = None
@@ -277,14 +314,21 @@ class Program:
     flows : list[FlowDef] = None
     builds : list[Build] = None
     file : str = None
+    path : str = None
+    checked : dict[int, Exception | None] = None
+    flowindex : dict[str, FlowDef] = None
+    uses : dict[str, dict[str, int]] = None
     
-    def getflow(self, name : str) -> FlowDef:
-        for each in self.flows:
-            if each.name == name: return each
+    def getflow(self, name : str | Var) -> FlowDef | None:
+        if isinstance(name, Var): name = name.name
+        if self.flowindex is None:
+            # later definitions of a flow shadow earlier ones
+            self.flowindex = {each.name : each for each in self.flows}
+        return self.flowindex.get(name)
 
 
 
-@dataclass(repr = False)
+@dataclass(repr = False, eq = False, slots = True)
 class Call(Expr):
     name : str = None
     args : Tuple | list[Node] = None
@@ -292,14 +336,20 @@ class Call(Expr):
     
     def __str__(self) -> str:
         return f'Call( {self.flow.name if self.flow is not None else ""} {self.name}({self.args}))'
+    
+    def key(self) -> tuple:
+        return (self.name, tuple(self.args) if type(self.args) == list else self.args)
 
 
 
-@dataclass
+@dataclass(eq = False, slots = True)
 class Slice(Node):
     left : Node = None
     right : Node = None
     step : Node = None
+    
+    def key(self) -> tuple:
+        return (self.left, self.right, self.step)
 
 
 
@@ -332,6 +382,10 @@ class CodeError(Exception):
         self.charpos = charpos
         self.ichain = ichain
         # self.context = context
+        
+        # set by `frontend.compiler`: the stage that failed, and the flow or build it failed in
+        self.stage : str = None
+        self.scope : str = None
     
     def __str__(self) -> str:
         return (
@@ -384,6 +438,10 @@ class UnknownFlow(CodeError):
     def __init__(self, *args: object, line: int = None, charpos: int = None, ichain: InferenceChain = None) -> None:
         super().__init__(*args, line=line, charpos=charpos, ichain=ichain)
 
+class UnknownBuild(CodeError):
+    def __init__(self, *args: object, line: int = None, charpos: int = None, ichain: InferenceChain = None) -> None:
+        super().__init__(*args, line=line, charpos=charpos, ichain=ichain)
+
 
 class InvalidSyntax(CodeError):
     def __init__(self, *args: object, line: int = None, charpos: int = None, ichain: InferenceChain = None) -> None:
@@ -407,6 +465,11 @@ class ReturnError(CodeError):
         super().__init__(*args, line=line, charpos=charpos, ichain=ichain)
 
 
+class InternalError(CodeError):
+    def __init__(self, *args: object, line: int = None, charpos: int = None, ichain: InferenceChain = None) -> None:
+        super().__init__(*args, line=line, charpos=charpos, ichain=ichain)
+
+
 
 
 